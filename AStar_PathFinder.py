@@ -1,4 +1,5 @@
 import heapq
+import MapGrid
 
 def heuristic(a, b):
     """
@@ -7,31 +8,14 @@ def heuristic(a, b):
     """
     return abs(a[0] - b[0]) + abs(a[1] - b[1])
 
-def get_neighbors(node, grid):
+def reconstruct_path(came_from, current, width):
     """
-    Given a node (x, y) and a grid, return valid neighbor nodes.
-    Only returns neighbors that are within bounds and are free (grid value 0).
+    Reconstructs the path from start to goal using the flat came_from array.
     """
-    # Convert coordinates to integers
-    x, y = int(node[0]), int(node[1])
-    neighbors = []
-    # Define 4-connected grid moves: up, down, left, right.
-    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-        nx, ny = x + dx, y + dy
-        if 0 <= ny < len(grid) and 0 <= nx < len(grid[0]):
-            if grid[ny][nx] == 0:  # 0 means walkable
-                neighbors.append((nx, ny))
-    return neighbors
-
-
-def reconstruct_path(came_from, current):
-    """
-    Reconstructs the path from start to goal using the came_from dictionary.
-    """
-    path = [current]
-    while current in came_from:
+    path = [(current % width, current // width)]
+    while came_from[current] != -1:
         current = came_from[current]
-        path.append(current)
+        path.append((current % width, current // width))
     path.reverse()  # so that it starts at the beginning
     return path
 
@@ -39,34 +23,62 @@ def a_star(grid, start, goal):
     """
     Executes the A* algorithm on a grid.
     
-    :param grid: 2D list, where 1 represents a wall and 0 represents open space.
+    Uses a binary heap with lazy deletion (outdated heap entries are skipped when popped),
+    a closed set, and flat arrays indexed by y * width + x for the scores.
+    Ties on f are broken on the heuristic, so nodes closer to the goal are expanded first.
+    
+    :param grid: MapGrid (or 2D list), where 1 represents a wall and 0 represents open space.
     :param start: Tuple (x, y) representing the start cell.
     :param goal: Tuple (x, y) representing the goal cell.
     :return: A list of (x, y) tuples representing the path from start to goal, or None if no path found.
     """
-    open_set = []
-    heapq.heappush(open_set, (0, start))
+    grid = MapGrid.as_map_grid(grid)
+    cells, width, height = grid.cells, grid.width, grid.height
+    start_x, start_y = int(start[0]), int(start[1])
+    goal_x, goal_y = int(goal[0]), int(goal[1])
+    if not (0 <= start_x < width and 0 <= start_y < height):
+        return None
+    # An off-grid goal would wrap around to another cell's index; a wall goal cannot be reached.
+    if not grid.is_walkable(goal_x, goal_y):
+        return None
+    if (start_x, start_y) == (goal_x, goal_y):
+        return [(start_x, start_y)]
+    
+    start_index = start_y * width + start_x
+    goal_index = goal_y * width + goal_x
+    g_score = [-1] * (width * height)     # -1 means not reached yet
+    came_from = [-1] * (width * height)
+    closed = bytearray(width * height)
     
-    came_from = {}
-    g_score = {start: 0}
-    f_score = {start: heuristic(start, goal)}
+    g_score[start_index] = 0
+    start_h = heuristic((start_x, start_y), (goal_x, goal_y))
+    open_set = [(start_h, start_h, start_index)]
     
     while open_set:
-        # Pop the node with the lowest f_score
-        current = heapq.heappop(open_set)[1]
+        # Pop the node with the lowest f_score (then the lowest heuristic)
+        current = heapq.heappop(open_set)[2]
+        if closed[current]:
+            continue  # An outdated entry for a node that was already expanded
         
-        if current == goal:
-            return reconstruct_path(came_from, current)
+        if current == goal_index:
+            return reconstruct_path(came_from, current, width)
+        closed[current] = 1
         
-        for neighbor in get_neighbors(current, grid):
-            tentative_g_score = g_score[current] + 1  # assume cost between adjacent nodes is 1
-            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, goal)
-                # Only add the neighbor if it's not already in the open set.
-                if neighbor not in [item[1] for item in open_set]:
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
+        x, y = current % width, current // width
+        tentative_g_score = g_score[current] + 1  # assume cost between adjacent nodes is 1
+        # Define 4-connected grid moves: up, down, left, right.
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            neighbor = ny * width + nx
+            if 0 <= ny < height and 0 <= nx < width and cells[neighbor] == 0:  # 0 means walkable
+                if closed[neighbor]:
+                    continue
+                if g_score[neighbor] == -1 or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    h = abs(nx - goal_x) + abs(ny - goal_y)
+                    # Pushing again instead of updating in place; the old entry is skipped later.
+                    heapq.heappush(open_set, (tentative_g_score + h, h, neighbor))
                     
     # No path found
-    return None
\ No newline at end of file
+    return None
@@ -0,0 +1,136 @@
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pygame
+import AssetPack
+
+class AssetCache:
+
+    def __init__(self):
+        """
+        Process-wide image and sound cache. Every file is decoded from disk once and
+        the same Surface (or Sound) is handed out to everything that asks for it.
+        """
+        self.images = {}         # Dict mapping (path, mode, size) to the loaded Surface
+        self.sounds = {}         # Dict mapping path to the loaded Sound
+        self.hits = 0            # Number of requests served from memory
+        self.misses = 0          # Number of requests that had to decode the file
+        self.decoded_bytes = 0   # Pixel memory held by the cached surfaces
+        self.lock = threading.Lock()   # The level loader fills the cache from a worker thread
+
+
+    def load_image(self, path, mode="alpha", size=None):
+        """
+        Returns the Surface for path, decoding it on the first request only.
+        mode: "alpha" for convert_alpha(), "opaque" for convert(), None to keep the file's format.
+        size: (width, height) to scale the image to after converting it, None to keep its size.
+        """
+        key = (path, mode, size)
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.hits += 1
+                return image
+        # Decoded without holding the lock, so other threads are not kept waiting on the file
+        return self.add_image(key, AssetPack.asset_pack.load_image(path))
+
+
+    def add_image(self, key, image):
+        """
+        Converts and scales a decoded image as its key asks and stores it. Needs the display.
+        If another thread stored the same key meanwhile, that Surface is kept and returned.
+        """
+        path, mode, size = key
+        if mode == "alpha":
+            image = image.convert_alpha()
+        elif mode == "opaque":
+            image = image.convert()
+        if size is not None:
+            image = pygame.transform.scale(image, size)
+        with self.lock:
+            self.misses += 1
+            stored = self.images.get(key)
+            if stored is not None:
+                return stored
+            self.images[key] = image
+            self.decoded_bytes += image.get_pitch() * image.get_height()
+            return image
+
+
+    def load_sound(self, path):
+        with self.lock:
+            sound = self.sounds.get(path)
+            if sound is not None:
+                self.hits += 1
+                return sound
+        return self.add_sound(path, AssetPack.asset_pack.load_sound(path))
+
+
+    def add_sound(self, path, sound):
+        # Stores a decoded sound, or returns the one another thread stored meanwhile.
+        with self.lock:
+            self.misses += 1
+            return self.sounds.setdefault(path, sound)
+
+
+    def preload(self, images, sounds, workers=None):
+        """
+        Decodes the given images ((path, mode, size) keys, as load_image() takes them) and
+        sounds on a thread pool and adds them to the cache. Only the decoding runs in the
+        workers: converting and scaling need the display, so they run on this thread as each
+        image arrives. workers=1 loads everything one at a time on this thread instead.
+        Returns the number of seconds it took.
+        """
+        started = time.perf_counter()
+        with self.lock:
+            images = [key for key in dict.fromkeys(images) if key not in self.images]
+            sounds = [path for path in dict.fromkeys(sounds) if path not in self.sounds]
+        if workers == 1:
+            for key in images:
+                self.load_image(*key)
+            for path in sounds:
+                self.load_sound(path)
+            return time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            image_futures = {pool.submit(AssetPack.asset_pack.load_image, key[0]): key for key in images}
+            sound_futures = {pool.submit(AssetPack.asset_pack.load_sound, path): path for path in sounds}
+            for future in as_completed(image_futures):
+                self.add_image(image_futures[future], future.result())
+            for future in as_completed(sound_futures):
+                self.add_sound(sound_futures[future], future.result())
+        return time.perf_counter() - started
+
+
+    def decode_images(self, images):
+        """
+        Decodes the given images ((path, mode, size) keys) that are not cached yet without
+        converting them, which is safe off the main thread. Returns key -> decoded Surface,
+        to be handed to add_image() on the main thread.
+        """
+        with self.lock:
+            images = [key for key in dict.fromkeys(images) if key not in self.images]
+        return {key: AssetPack.asset_pack.load_image(key[0]) for key in images}
+
+
+    def load_animations(self, animation_paths, mode="alpha"):
+        # Maps a dictionary of animation name -> list of paths to animation name -> list of Surfaces.
+        return {name: [self.load_image(path, mode) for path in paths] for name, paths in animation_paths.items()}
+
+
+    def get_stats(self):
+        return {"images": len(self.images), "sounds": len(self.sounds), "hits": self.hits, "misses": self.misses,
+                "decoded_bytes": self.decoded_bytes}
+
+
+    def clear(self):
+        with self.lock:
+            self.images = {}
+            self.sounds = {}
+            self.hits = 0
+            self.misses = 0
+            self.decoded_bytes = 0
+
+
+# The single cache shared by the whole process.
+asset_cache = AssetCache()
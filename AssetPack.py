@@ -0,0 +1,210 @@
+import io
+import os
+import sys
+import mmap
+import struct
+import argparse
+import threading
+import pygame
+
+PACK_FILENAME = "assets.pack"
+PACKED_DIRECTORIES = ["Images", "Sprites", "Sounds"]
+PACKED_EXTENSIONS = {".png", ".jpg", ".mp3", ".wav"}
+MAGIC = b"MZPK"
+VERSION = 1
+HEADER = struct.Struct("<4sHI")     # magic, version, number of files
+ENTRY = struct.Struct("<QQ")        # offset and size of a file, after its path
+PATH_LENGTH = struct.Struct("<H")
+
+
+def normalise_path(path):
+    # "Images\\1_Start-Up.png" and "Images/1_Start-Up.png" name the same asset.
+    return path.replace("\\", "/")
+
+
+class PackedFile(io.RawIOBase):
+
+    def __init__(self, data):
+        """Read-only file object over a slice of the mapped pack, without copying it."""
+        super().__init__()
+        self.data = data
+        self.position = 0
+
+
+    def readable(self):
+        return True
+
+
+    def seekable(self):
+        return True
+
+
+    def readinto(self, buffer):
+        size = min(len(buffer), len(self.data) - self.position)
+        if size <= 0:
+            return 0
+        buffer[:size] = self.data[self.position:self.position + size]
+        self.position += size
+        return size
+
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += len(self.data)
+        self.position = max(0, offset)
+        return self.position
+
+
+    def tell(self):
+        return self.position
+
+
+class AssetPack:
+
+    def __init__(self, filename=PACK_FILENAME):
+        """
+        Serves images and sounds from a single archive written by this module's packer.
+        The pack is memory-mapped on first use; files that are not in it (or every file,
+        when there is no pack, e.g. during development) are loaded from disk as before.
+        Outside a frozen build a loose file edited after the pack was built is used instead
+        of its stale packed copy.
+        """
+        self.filename = filename
+        self.mapped = None
+        self.index = None        # Normalised path -> (offset, size)
+        self.pack_mtime = None   # Modification time of the pack, None when loose files are not checked
+        self.lock = threading.Lock()
+        self.packed_loads = 0    # Files served from the pack
+        self.loose_loads = 0     # Files loaded from disk
+
+
+    def open(self):
+        with self.lock:
+            if self.index is not None:
+                return
+            index = {}
+            if os.path.exists(self.filename):
+                try:
+                    with open(self.filename, "rb") as file:
+                        self.mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                    magic, version, count = HEADER.unpack_from(self.mapped, 0)
+                    if magic != MAGIC or version != VERSION:
+                        raise ValueError("not an asset pack of this version")
+                    offset = HEADER.size
+                    for i in range(count):
+                        length, = PATH_LENGTH.unpack_from(self.mapped, offset)
+                        offset += PATH_LENGTH.size
+                        path = self.mapped[offset:offset + length].decode("utf-8")
+                        offset += length
+                        index[path] = ENTRY.unpack_from(self.mapped, offset)
+                        offset += ENTRY.size
+                    # Frozen builds ship only the pack, so there are no loose files to compare with
+                    if not getattr(sys, "frozen", False):
+                        self.pack_mtime = os.path.getmtime(self.filename)
+                except (OSError, ValueError, struct.error) as e:
+                    print(f"Error opening asset pack '{self.filename}': {e}")
+                    index = {}
+            self.index = index
+
+
+    def get_file(self, path):
+        """
+        Returns a file object for a packed asset, or None if it is not in the pack or its
+        loose file is newer than the pack.
+        """
+        if self.index is None:
+            self.open()
+        entry = self.index.get(normalise_path(path))
+        if entry is not None and self.pack_mtime is not None and self.is_newer_than_pack(path):
+            entry = None
+        if entry is None:
+            self.loose_loads += 1
+            return None
+        offset, size = entry
+        self.packed_loads += 1
+        return PackedFile(memoryview(self.mapped)[offset:offset + size])
+
+
+    def is_newer_than_pack(self, path):
+        # True if the loose file was modified after the pack was built.
+        try:
+            return os.path.getmtime(normalise_path(path)) > self.pack_mtime
+        except OSError:
+            return False
+
+
+    def load_image(self, path):
+        # Drop-in replacement for pygame.image.load(path).
+        file = self.get_file(path)
+        if file is None:
+            return pygame.image.load(path)
+        return pygame.image.load(file, normalise_path(path))
+
+
+    def load_sound(self, path):
+        # Drop-in replacement for pygame.mixer.Sound(path).
+        file = self.get_file(path)
+        if file is None:
+            return pygame.mixer.Sound(path)
+        return pygame.mixer.Sound(file)
+
+
+    def load_music(self, path):
+        """
+        Drop-in replacement for pygame.mixer.music.load(path). Returns the file object the
+        music streams from (None for a loose file), which must stay alive while it plays.
+        """
+        file = self.get_file(path)
+        if file is None:
+            pygame.mixer.music.load(path)
+        else:
+            pygame.mixer.music.load(file, normalise_path(path))
+        return file
+
+
+    def get_stats(self):
+        return {"packed_files": len(self.index or {}), "packed_loads": self.packed_loads, "loose_loads": self.loose_loads}
+
+
+def write_pack(filename, directories=PACKED_DIRECTORIES):
+    """Writes every image and sound under the given directories into one pack. Returns the number of files."""
+    paths = []
+    for directory in directories:
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in PACKED_EXTENSIONS:
+                    paths.append(normalise_path(os.path.join(root, name)))
+
+    index_size = HEADER.size + sum(PATH_LENGTH.size + len(path.encode("utf-8")) + ENTRY.size for path in paths)
+    with open(filename, "wb") as pack:
+        pack.write(HEADER.pack(MAGIC, VERSION, len(paths)))
+        offset = index_size
+        for path in paths:
+            size = os.path.getsize(path)
+            encoded = path.encode("utf-8")
+            pack.write(PATH_LENGTH.pack(len(encoded)) + encoded + ENTRY.pack(offset, size))
+            offset += size
+        for path in paths:
+            with open(path, "rb") as file:
+                pack.write(file.read())
+    return len(paths)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack the game's images and sounds into a single file.")
+    parser.add_argument("--output", default=PACK_FILENAME, help="File to write the pack to.")
+    parser.add_argument("directories", nargs="*", default=PACKED_DIRECTORIES, help="Directories to pack.")
+    args = parser.parse_args()
+    count = write_pack(args.output, args.directories)
+    print(f"Packed {count} files into {args.output} ({os.path.getsize(args.output)} bytes)")
+
+
+# The single pack shared by the whole process.
+asset_pack = AssetPack()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,29 @@
 import pygame
+import AssetPack
+import AssetCache
 
 class AudioManager:
+    # Paths of the sound effects, by effect name
+    soundEffectPaths = {
+        "menu_selection": "Sounds\\menu_selection.mp3",
+        "shoot": "Sounds\\shoot.mp3",
+        "bullet_hit": "Sounds\\bullet_hit.wav",
+        "player_damaged": "Sounds\\player_damaged.mp3",
+        "try_again": "Sounds\\try_again.mp3",
+        "level_completed": "Sounds\\level_completed.wav",
+        "power_up_hp": "Sounds\\power_up_hp.mp3",
+        "power_up_speed": "Sounds\\power_up_speed.mp3",
+        "power_down": "Sounds\\power_down.mp3",
+        "safe_spot": "Sounds\\safe_spot.wav",
+        "puzzle_enter": "Sounds\\puzzle_enter.mp3",
+        "puzzle_correct": "Sounds\\puzzle_correct.wav",
+        "puzzle_incorrect": "Sounds\\puzzle_incorrect.mp3",
+    }
+
     def __init__(self):
         # Initializes default variables. Call initialise() after pygame.mixer is set up.
         self.backgroundMusic = None     # A string for the current background music file path
+        self.musicFile = None           # File object the music streams from when it comes from the asset pack
         self.musicTracks = None         # A set for future mapping of situation to music.
         self.soundEffects = None          # Dict mapping effect names to pygame.mixer.Sound objects
         self.volume = 1.0               # Float 0.0 - 1.0
@@ -16,21 +36,7 @@ class AudioManager:
 
     def loadAudioResources(self):
         # Loads sound effects into memory. It is a mapping for a dictionary.
-        self.soundEffects = {
-            "menu_selection": pygame.mixer.Sound("Sounds\\menu_selection.mp3"),
-            "shoot": pygame.mixer.Sound("Sounds\\shoot.mp3"),
-            "bullet_hit": pygame.mixer.Sound("Sounds\\bullet_hit.wav"),
-            "player_damaged": pygame.mixer.Sound("Sounds\\player_damaged.mp3"),
-            "try_again": pygame.mixer.Sound("Sounds\\try_again.mp3"),
-            "level_completed": pygame.mixer.Sound("Sounds\\level_completed.wav"),
-            "power_up_hp": pygame.mixer.Sound("Sounds\\power_up_hp.mp3"),
-            "power_up_speed": pygame.mixer.Sound("Sounds\\power_up_speed.mp3"),
-            "power_down": pygame.mixer.Sound("Sounds\\power_down.mp3"),
-            "safe_spot": pygame.mixer.Sound("Sounds\\safe_spot.wav"),
-            "puzzle_enter": pygame.mixer.Sound("Sounds\\puzzle_enter.mp3"),
-            "puzzle_correct": pygame.mixer.Sound("Sounds\\puzzle_correct.wav"),
-            "puzzle_incorrect": pygame.mixer.Sound("Sounds\\puzzle_incorrect.mp3"),  
-        }
+        self.soundEffects = {name: AssetCache.asset_cache.load_sound(path) for name, path in AudioManager.soundEffectPaths.items()}
         
         # DO NOT FORGET TO ADD THE REST OF THE MUSIC FILES
         self.musicTracks = {
@@ -78,7 +84,7 @@ class AudioManager:
 
         # Load & play the background music
         try:
-            pygame.mixer.music.load(music_file)
+            self.musicFile = AssetPack.asset_pack.load_music(music_file)
             pygame.mixer.music.play(-1)  # -1 for infinite looping
             self.backgroundMusic = music_file
         except pygame.error as e:
@@ -0,0 +1,131 @@
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import pygame
+import AssetPack
+
+DEFAULT_BUDGET = 24 * 1024 * 1024   # Bytes of surfaces kept, about six 1280x720 screens
+COMPRESSION_LEVEL = 1                # Fast zlib level; screen images compress well even so
+
+
+class BackgroundCache:
+
+    def __init__(self, budget=DEFAULT_BUDGET, keep_compressed=True):
+        """
+        Full-screen background images, scaled and converted to the display format, kept
+        under a budget of surface bytes. When the budget is exceeded the least recently used
+        backgrounds are dropped; with keep_compressed their pixels are kept zlib-compressed,
+        which is much quicker to restore than decoding and scaling the image file again.
+        """
+        self.budget = budget
+        self.keep_compressed = keep_compressed
+        self.surfaces = OrderedDict()   # (path, size) -> Surface, least recently used first
+        self.compressed = {}            # (path, size) -> zlib-compressed RGB pixels of an evicted Surface
+        self.surface_bytes = 0          # Pixel memory held by self.surfaces
+        self.hits = 0                   # Requests served from a resident Surface
+        self.restores = 0               # Requests served by decompressing an evicted Surface
+        self.misses = 0                 # Requests that had to decode the image file
+        self.evictions = 0
+
+
+    def configure(self, budget, keep_compressed):
+        self.budget = budget
+        self.keep_compressed = keep_compressed
+        if not keep_compressed:
+            self.compressed = {}
+        self.evict()
+
+
+    def load(self, path, size):
+        """Returns the background in path scaled to size (width, height), in the display format."""
+        key = (path, size)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+        pixels = self.compressed.pop(key, None)
+        if pixels is not None:
+            self.restores += 1
+            return self.add(key, pygame.image.fromstring(zlib.decompress(pixels), size, "RGB"))
+        self.misses += 1
+        return self.add(key, AssetPack.asset_pack.load_image(path))
+
+
+    def add(self, key, image):
+        # Converts and scales a decoded image and stores it as the most recently used. Needs the display.
+        path, size = key
+        surface = image.convert()
+        if surface.get_size() != size:
+            surface = pygame.transform.scale(surface, size)
+        self.surfaces[key] = surface
+        self.surface_bytes += get_surface_bytes(surface)
+        self.evict()
+        return surface
+
+
+    def evict(self):
+        # Drops the least recently used surfaces until the budget is met, always keeping the newest one.
+        while self.surface_bytes > self.budget and len(self.surfaces) > 1:
+            key, surface = self.surfaces.popitem(last=False)
+            self.surface_bytes -= get_surface_bytes(surface)
+            self.evictions += 1
+            if self.keep_compressed:
+                self.compressed[key] = zlib.compress(pygame.image.tostring(surface, "RGB"), COMPRESSION_LEVEL)
+
+
+    def preload(self, keys, workers=None):
+        """
+        Decodes as many of the given (path, size) backgrounds, most wanted first, as fit in
+        the free budget on a thread pool; the rest are decoded when first asked for. Nothing
+        is evicted (and compressed) by a preload. workers=1 loads them one at a time on this
+        thread instead. Returns the number of seconds it took.
+        """
+        started = time.perf_counter()
+        bytes_per_pixel = pygame.display.get_surface().get_bytesize()
+        free = self.budget - self.surface_bytes
+        fitting = []
+        for key in dict.fromkeys(keys):
+            if key in self.surfaces or key in self.compressed:
+                continue
+            free -= key[1][0] * key[1][1] * bytes_per_pixel
+            if free < 0:
+                break
+            fitting.append(key)
+        # Added in reverse, so the most wanted background is the most recently used
+        fitting.reverse()
+        if workers == 1:
+            for key in fitting:
+                self.load(*key)
+            return time.perf_counter() - started
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(AssetPack.asset_pack.load_image, path) for path, size in fitting]
+            for key, future in zip(fitting, futures):
+                self.misses += 1
+                self.add(key, future.result())
+        return time.perf_counter() - started
+
+
+    def get_stats(self):
+        return {"resident": len(self.surfaces), "resident_bytes": self.surface_bytes, "budget": self.budget,
+                "compressed": len(self.compressed), "compressed_bytes": sum(len(pixels) for pixels in self.compressed.values()),
+                "hits": self.hits, "restores": self.restores, "misses": self.misses, "evictions": self.evictions}
+
+
+    def clear(self):
+        self.surfaces = OrderedDict()
+        self.compressed = {}
+        self.surface_bytes = 0
+        self.hits = 0
+        self.restores = 0
+        self.misses = 0
+        self.evictions = 0
+
+
+def get_surface_bytes(surface):
+    return surface.get_pitch() * surface.get_height()
+
+
+# The single background cache shared by the whole process.
+background_cache = BackgroundCache()
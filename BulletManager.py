@@ -1,20 +1,147 @@
+import numpy
 import pygame
+import AssetCache
+
+# Unit direction vector (x, y) of a bullet fired facing each way
+DIRECTIONS = {
+    "up": (0, -1),
+    "down": (0, 1),
+    "left": (-1, 0),
+    "right": (1, 0),
+}
 
 class BulletManager:
-    
-    def __init__(self):
-        # Create a sprite group for bullets.
-        self.bullets = pygame.sprite.Group()
+    imagePath = "Sprites\\Bullet.png"
+
+    def __init__(self, capacity=256):
+        """
+        Pooled bullet store. Bullets are not objects: each one is a slot in a set of NumPy
+        arrays (struct of arrays), so firing and expiring bullets allocates nothing and every
+        bullet in flight is moved and expired by a few array operations per frame.
+        The pool doubles in size if more bullets are in flight than it has slots.
+        """
+        self.capacity = 0
+        self.x = numpy.zeros(0)               # Centre of each bullet
+        self.y = numpy.zeros(0)
+        self.direction_x = numpy.zeros(0)     # Unit direction vector
+        self.direction_y = numpy.zeros(0)
+        self.speed = numpy.zeros(0)
+        self.damage = numpy.zeros(0, dtype=numpy.int32)
+        self.distance_traveled = numpy.zeros(0)
+        self.max_range = numpy.zeros(0)
+        self.wall_distance = numpy.zeros(0)   # Distance at which the bullet hits a wall, worked out when fired
+        self.active = numpy.zeros(0, dtype=bool)   # False once the bullet hit something or ran out of range
+        self.rects = []                       # The rect each bullet is drawn at, reused between bullets
+        self.slots = []                       # Slots of the bullets in flight, in the order they were fired
+        self.free_slots = []                  # Slots that can be reused, the next one last
+        self.image = None
+        self.grow(capacity)
+
+
+    def grow(self, capacity):
+        added = capacity - self.capacity
+        for name in ("x", "y", "direction_x", "direction_y", "speed", "damage",
+                     "distance_traveled", "max_range", "wall_distance", "active"):
+            table = getattr(self, name)
+            setattr(self, name, numpy.concatenate((table, numpy.zeros(added, dtype=table.dtype))))
+        self.rects.extend(pygame.Rect(0, 0, 0, 0) for i in range(added))
+        self.free_slots[:0] = range(capacity - 1, self.capacity - 1, -1)
+        self.capacity = capacity
+
+
+    def add_bullet(self, position, direction, collision_manager, speed, damage, max_range):
+        """
+        Fires a bullet from the player at position (its top-left corner) in the direction
+        the player faces ("up", "down", "left" or "right"). Bullets fly along an axis, so
+        the wall they will hit is found now, once, by marching through the wall grid.
+        Returns the bullet's slot.
+        """
+        if self.image is None:
+            # The shared bullet image from the asset cache
+            self.image = AssetCache.asset_cache.load_image(BulletManager.imagePath)
+        if not self.free_slots:
+            self.grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+        # The bullet starts at the centre of the player image
+        self.x[slot] = position.x + 16
+        self.y[slot] = position.y + 16
+        self.direction_x[slot], self.direction_y[slot] = DIRECTIONS.get(direction, (0, 0))
+        self.speed[slot] = speed
+        self.damage[slot] = damage
+        self.distance_traveled[slot] = 0
+        self.max_range[slot] = max_range
+        self.active[slot] = True
+        rect = self.rects[slot]
+        rect.size = self.image.get_size()
+        rect.center = (position.x + 16, position.y + 16)
+        self.wall_distance[slot] = collision_manager.get_wall_distance(rect, DIRECTIONS.get(direction, (0, 0)))
+        self.slots.append(slot)
+        return slot
+
+
+    def update(self, dt):
+        # Moves every bullet and spends the ones that hit a wall or ran out of range, all in
+        # one pass of array operations over the slots in flight. Spent bullets stay in flight
+        # until remove_inactive(), so the collision stage still sees a bullet that hit a wall
+        # and an enemy in the same frame.
+        if not self.slots:
+            return
+        slots = numpy.array(self.slots)
+        displacement_x = self.direction_x[slots] * self.speed[slots] * dt
+        displacement_y = self.direction_y[slots] * self.speed[slots] * dt
+        x = self.x[slots] + displacement_x
+        y = self.y[slots] + displacement_y
+        distance_traveled = self.distance_traveled[slots] + numpy.sqrt(displacement_x * displacement_x + displacement_y * displacement_y)
+
+        # Bullets that reached their wall stop there rather than passing through a thin wall
+        # when a long frame moves them further than the wall is thick.
+        wall_distance = self.wall_distance[slots]
+        hit_wall = distance_traveled >= wall_distance
+        overshoot = numpy.where(hit_wall, distance_traveled - wall_distance, 0.0)
+        x = numpy.where(hit_wall, x - self.direction_x[slots] * overshoot, x)
+        y = numpy.where(hit_wall, y - self.direction_y[slots] * overshoot, y)
+        distance_traveled = numpy.where(hit_wall, wall_distance, distance_traveled)
+        # Bullets that hit a wall or exceeded their maximum range are spent.
+        spent = hit_wall | (distance_traveled >= self.max_range[slots])
+
+        self.x[slots] = x
+        self.y[slots] = y
+        self.distance_traveled[slots] = distance_traveled
+        self.active[slots[spent]] = False
+        rects = self.rects
+        for slot, center in zip(self.slots, zip(x.tolist(), y.tolist())):
+            rects[slot].center = center
+
+
+    def hit(self, slot):
+        # Spends a bullet that hit an enemy and returns its damage.
+        self.active[slot] = False
+        return int(self.damage[slot])
+
+
+    def remove_inactive(self):
+        active = self.active[self.slots]
+        if active.all():
+            return
+        self.free_slots.extend(slot for slot, alive in zip(reversed(self.slots), active[::-1].tolist()) if not alive)
+        self.slots = [slot for slot, alive in zip(self.slots, active.tolist()) if alive]
+
+
+    def clear(self):
+        self.active[self.slots] = False
+        self.remove_inactive()
+
+
+    def get_rects(self):
+        # Copies of the rects the bullets are drawn at (the pooled rects are reused).
+        return [self.rects[slot].copy() for slot in self.slots]
+
 
-    def add_bullet(self, bullet):
-        self.bullets.add(bullet)
+    def __len__(self):
+        return len(self.slots)
 
-    def update(self, dt, collision_manager, audio_manager, enemy_sprites):
-        # Update all bullets and remove the ones that are no longer active.
-        self.bullets.update(dt, collision_manager, audio_manager, enemy_sprites)
-        for bullet in self.bullets.copy():
-            if not bullet.is_active:
-                self.bullets.remove(bullet)
 
     def draw(self, screen):
-        self.bullets.draw(screen)
\ No newline at end of file
+        if self.slots:
+            image, rects = self.image, self.rects
+            screen.blits([(image, rects[slot]) for slot in self.slots], False)
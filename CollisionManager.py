@@ -1,16 +1,69 @@
+import math
 import pygame
 
+# Tile layers that trigger something when the player walks onto them
+TRIGGER_LAYERS = ["PowerUpSpeed", "PowerUpHP", "SafeSpot", "ExitDoor"]
+
+
+class SpriteGrid:
+
+    def __init__(self, cell_width, cell_height):
+        """
+        Uniform-grid broadphase: buckets sprites by the cells their collision_rect covers,
+        so finding what overlaps a rect only looks at the sprites in the same cells.
+        """
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.cells = {}   # (column, row) -> list of sprites touching that cell
+
+
+    def rebuild(self, sprites):
+        self.cells = {}
+        for sprite in sprites:
+            for cell in self.get_cells(sprite.collision_rect):
+                self.cells.setdefault(cell, []).append(sprite)
+
+
+    def get_cells(self, rect):
+        first_column = rect.left // self.cell_width
+        last_column = (rect.right - 1) // self.cell_width
+        first_row = rect.top // self.cell_height
+        last_row = (rect.bottom - 1) // self.cell_height
+        return [(x, y) for y in range(first_row, last_row + 1) for x in range(first_column, last_column + 1)]
+
+
+    def query(self, rect):
+        # Returns the live sprites whose collision_rect overlaps rect, each once.
+        found = {}
+        for cell in self.get_cells(rect):
+            for sprite in self.cells.get(cell, ()):
+                if sprite not in found and sprite.alive() and rect.colliderect(sprite.collision_rect):
+                    found[sprite] = True
+        return list(found)
+
+
 class CollisionManager:
     
     def __init__(self, tile_width, tile_height):
         self.tile_width = tile_width   # The width of each tile in pixels.
         self.tile_height = tile_height # The height of each tile in pixels.
+        # Broadphase grids of moving sprites by group name (the game builds an "enemies" grid), rebuilt
+        # once per frame. Bullets are not sprites: find_contacts() queries the grid with BulletManager.rects
+        self.sprite_grids = {}
         
 
     def initialise(self, map_renderer):
         self.tmx_data = map_renderer.get_tmx_data()   # Loaded Tiled map data (using pytmx).
         self.scaled_tiles = map_renderer.get_scaled_tiles()   # A dictionary mapping gid to tile Surface.
         self.map_grid = map_renderer.get_map_grid()
+        # Per-layer occupancy grids, built once per level: layer name -> [row][column] -> Rect or None.
+        # Layers that share a name are merged into one grid, so all of them still collide.
+        self.layer_grids = {}
+        for layer in self.tmx_data.visible_layers:
+            if hasattr(layer, 'data'):
+                self.layer_grids[layer.name] = self.build_layer_grid(layer, self.layer_grids.get(layer.name))
+        self.grid_width = self.tmx_data.width
+        self.grid_height = self.tmx_data.height
       
     
     def check_sprite_collision(self, sprite1, sprite2):
@@ -19,37 +72,137 @@ class CollisionManager:
         return collided
 
 
-    def get_tile_rects(self, layer_name):
-        # Returns a list of pygame.Rect objects for all tiles in a specific layer.
-        rects = []
-        for layer in self.tmx_data.visible_layers:
-            # Check if this is a tile layer and if its name matches the one we need.
-            if hasattr(layer, 'data') and layer.name == layer_name:
-                for x, y, gid in layer:
-                    # Get the tile image (if available). We only need the rect.
-                    tile = self.scaled_tiles.get(gid)
-                    if tile:
-                        rect = pygame.Rect(
-                            x * self.tile_width, 
-                            y * self.tile_height + 48, 
-                            self.tile_width, 
-                            self.tile_height
-                        )
-                        rects.append(rect)
-        return rects
+    def update_sprite_grid(self, name, sprites):
+        # Rebuilds the broadphase grid for a group of sprites from their current collision rects.
+        grid = self.sprite_grids.get(name)
+        if grid is None:
+            grid = self.sprite_grids[name] = SpriteGrid(self.tile_width, self.tile_height)
+        grid.rebuild(sprites)
+
+
+    def get_sprite_collisions(self, sprite, name):
+        """
+        Returns the sprites of the named grid that collide with sprite. The grid holds
+        the rects as of its last update, so it must be rebuilt after its sprites move.
+        """
+        return self.get_rect_collisions(sprite.collision_rect, name)
+
+
+    def get_rect_collisions(self, rect, name):
+        # Returns the sprites of the named grid that collide with a rect.
+        grid = self.sprite_grids.get(name)
+        if grid is None:
+            return []
+        return grid.query(rect)
+
+
+    def find_contacts(self, player, bullet_manager):
+        """
+        Collision stage, run once per frame after the player and the bullets have moved.
+        Finds every contact in one pass and returns (bullet_hits, tile_contacts):
+        bullet_hits: a (bullet slot, enemy) pair for every bullet overlapping an enemy.
+        tile_contacts: trigger layer -> tile rects the player overlaps, or None while the
+        player is solving a puzzle (the triggers are not checked then).
+        Needs the "enemies" grid to be up to date.
+        """
+        bullet_hits = []
+        rects = bullet_manager.rects
+        for slot in bullet_manager.slots:
+            for enemy in self.get_rect_collisions(rects[slot], "enemies"):
+                bullet_hits.append((slot, enemy))
+        tile_contacts = None
+        if player.solving_puzzle is None:
+            tile_contacts = {layer_name: self.check_tile_collision(player, layer_name) for layer_name in TRIGGER_LAYERS}
+        return bullet_hits, tile_contacts
+
+
+    def build_layer_grid(self, layer, grid=None):
+        # Returns a [row][column] grid holding the tile rect of every occupied cell (None for empty cells).
+        # Given the grid of an earlier layer, the occupied cells of this one are added to it.
+        if grid is None:
+            grid = [[None for x in range(self.tmx_data.width)] for y in range(self.tmx_data.height)]
+        # Compiled levels list their occupied cells, so only TMX layers need a full scan
+        occupied_cells = getattr(layer, 'occupied_cells', None)
+        if occupied_cells is None:
+            occupied_cells = [(x, y) for x, y, gid in layer if self.scaled_tiles.get(gid)]
+        for x, y in occupied_cells:
+            grid[y][x] = pygame.Rect(
+                x * self.tile_width,
+                y * self.tile_height + 48,
+                self.tile_width,
+                self.tile_height
+            )
+        return grid
 
 
     def check_tile_collision(self, sprite, layer_name):
         # List of tile rects that collide with the sprite.
+        return self.check_rect_collision(sprite.collision_rect, layer_name)
+
+
+    def check_rect_collision(self, sprite_rect, layer_name):
+        # List of tile rects that collide with a rect.
         collisions = []
-        tile_rects = self.get_tile_rects(layer_name) # layer_name: Name of the layer to check (e.g., "Walls").
-        for rect in tile_rects:
-            if pygame.Rect.colliderect(sprite.collision_rect, rect):   # Checks collision between two rectangles
-                collisions.append(rect)
+        grid = self.layer_grids.get(layer_name) # layer_name: Name of the layer to check (e.g., "Walls").
+        if grid is None:
+            return collisions
+        
+        # Only visit the cells covered by the rect (48 pixels are reserved for the HUD).
+        first_column = max(sprite_rect.left // self.tile_width, 0)
+        last_column = min((sprite_rect.right - 1) // self.tile_width, self.grid_width - 1)
+        first_row = max((sprite_rect.top - 48) // self.tile_height, 0)
+        last_row = min((sprite_rect.bottom - 1 - 48) // self.tile_height, self.grid_height - 1)
+        
+        for y in range(first_row, last_row + 1):
+            row = grid[y]
+            for x in range(first_column, last_column + 1):
+                rect = row[x]
+                if rect and pygame.Rect.colliderect(sprite_rect, rect):   # Checks collision between two rectangles
+                    collisions.append(rect.copy())
                 
         return collisions
 
 
+    def get_wall_distance(self, rect, direction):
+        """
+        Returns how far rect can move along an axis direction ((1, 0), (-1, 0), (0, 1) or (0, -1))
+        before it overlaps a wall tile by one pixel, by marching through the wall grid from
+        the rect's leading edge. Returns 0 if rect already overlaps a wall and math.inf if
+        no wall is in the way.
+        """
+        if self.check_rect_collision(rect, "Walls"):
+            return 0
+        grid = self.layer_grids.get("Walls")
+        if grid is None:
+            return math.inf
+        # The rows (or columns) the rect sweeps through (48 pixels are reserved for the HUD)
+        first_column = max(rect.left // self.tile_width, 0)
+        last_column = min((rect.right - 1) // self.tile_width, self.grid_width - 1)
+        first_row = max((rect.top - 48) // self.tile_height, 0)
+        last_row = min((rect.bottom - 1 - 48) // self.tile_height, self.grid_height - 1)
+        rows = range(first_row, last_row + 1)
+        columns = range(first_column, last_column + 1)
+        
+        x_direction, y_direction = direction
+        if x_direction > 0:
+            for column in range(max((rect.right - 1) // self.tile_width + 1, 0), self.grid_width):
+                if any(grid[row][column] for row in rows):
+                    return column * self.tile_width - rect.right + 1
+        elif x_direction < 0:
+            for column in range(min(rect.left // self.tile_width - 1, self.grid_width - 1), -1, -1):
+                if any(grid[row][column] for row in rows):
+                    return rect.left - (column + 1) * self.tile_width + 1
+        elif y_direction > 0:
+            for row in range(max((rect.bottom - 1 - 48) // self.tile_height + 1, 0), self.grid_height):
+                if any(grid[row][column] for column in columns):
+                    return row * self.tile_height + 48 - rect.bottom + 1
+        elif y_direction < 0:
+            for row in range(min((rect.top - 48) // self.tile_height - 1, self.grid_height - 1), -1, -1):
+                if any(grid[row][column] for column in columns):
+                    return rect.top - ((row + 1) * self.tile_height + 48) + 1
+        return math.inf
+
+
     def check_wall_collisions(self, sprite):
         # Check collisions between the sprite and wall tiles.
         return self.check_tile_collision(sprite, "Walls")
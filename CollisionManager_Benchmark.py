@@ -0,0 +1,130 @@
+import argparse
+import json
+import random
+import time
+import pygame
+import CollisionManager
+from PathFinder_Benchmark import generate_maze
+
+# Map sizes (width, height) in tiles, from the size of a level up to 500x500.
+DEFAULT_SIZES = [(40, 21), (101, 101), (251, 251), (501, 501)]
+
+TILE_SIZE = 32
+
+
+class GeneratedLayer:
+
+    def __init__(self, name, grid):
+        """ Tile layer in the shape of a pytmx layer: data[y][x] is 1 for a wall and 0 for an empty cell. """
+        self.name = name
+        self.data = [list(row) for row in grid]
+
+
+    def __iter__(self):
+        # (x, y, gid) of every cell, like iterating a pytmx tile layer.
+        for y, row in enumerate(self.data):
+            for x, gid in enumerate(row):
+                yield x, y, gid
+
+
+class GeneratedMap:
+
+    def __init__(self, grid):
+        """ The parts of a loaded level that CollisionManager.initialise() reads, for a generated maze. """
+        self.grid = grid
+        self.width = grid.width
+        self.height = grid.height
+        self.visible_layers = [GeneratedLayer("Walls", grid)]
+        self.scaled_tiles = {1: pygame.Surface((TILE_SIZE, TILE_SIZE))}
+
+
+    def get_tmx_data(self):
+        return self
+
+
+    def get_scaled_tiles(self):
+        return self.scaled_tiles
+
+
+    def get_map_grid(self):
+        return self.grid
+
+
+def scan_tile_collision(wall_rects, sprite_rect):
+    # The lookup the grid replaced: test the rect against every wall tile of the layer.
+    return [rect for rect in wall_rects if sprite_rect.colliderect(rect)]
+
+
+def run_benchmark(sizes, queries_per_map, seed, time_budget):
+    """
+    Times CollisionManager.check_rect_collision() on player-sized rects at random places in
+    generated mazes of each size, against a scan of every wall tile, and checks that both
+    find the same walls. The grid only visits the cells under the rect, so its cost per
+    query should not grow with the map; the scan's grows with the number of walls.
+    :param time_budget: Seconds the scan may spend on one map's queries before the rest are skipped.
+    """
+    rng = random.Random(seed)
+    results = []
+    for width, height in sizes:
+        level = GeneratedMap(generate_maze(width, height, rng, 0.5))
+        began = time.perf_counter()
+        collision_manager = CollisionManager.CollisionManager(TILE_SIZE, TILE_SIZE)
+        collision_manager.initialise(level)
+        initialise_seconds = time.perf_counter() - began
+        wall_rects = [rect for row in collision_manager.layer_grids["Walls"] for rect in row if rect]
+
+        queries = [pygame.Rect(rng.randrange(width * TILE_SIZE), rng.randrange(height * TILE_SIZE) + 48, 28, 28)
+                   for i in range(queries_per_map)]
+        grid_times = []
+        scan_times = []
+        mismatches = 0
+        for rect in queries:
+            began = time.perf_counter()
+            found = collision_manager.check_rect_collision(rect, "Walls")
+            grid_times.append(time.perf_counter() - began)
+            if sum(scan_times) > time_budget:
+                continue
+            began = time.perf_counter()
+            expected = scan_tile_collision(wall_rects, rect)
+            scan_times.append(time.perf_counter() - began)
+            if sorted(map(tuple, found)) != sorted(map(tuple, expected)):
+                mismatches += 1
+
+        result = {
+            "width": width,
+            "height": height,
+            "walls": len(wall_rects),
+            "initialise_ms": initialise_seconds * 1000,
+            "queries": len(grid_times),
+            "grid_mean_us": sum(grid_times) / len(grid_times) * 1000000,
+            "scan_queries": len(scan_times),
+            "scan_mean_us": sum(scan_times) / len(scan_times) * 1000000 if scan_times else None,
+            "mismatches": mismatches,
+        }
+        results.append(result)
+        print(f"{width}x{height} ({len(wall_rects)} walls): initialise {result['initialise_ms']:.1f} ms, "
+              f"grid {result['grid_mean_us']:.2f} us/query, scan {result['scan_mean_us'] or 0:.1f} us/query "
+              f"({len(scan_times)} of {len(queries)} queries), {mismatches} mismatches")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tile collision grid on generated maps.")
+    parser.add_argument("--sizes", nargs="*", default=[f"{w}x{h}" for w, h in DEFAULT_SIZES],
+                        help="Map sizes in tiles as WIDTHxHEIGHT.")
+    parser.add_argument("--queries", type=int, default=1000, help="Collision queries per map.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the maps and the queries.")
+    parser.add_argument("--time-budget", type=float, default=10.0,
+                        help="Seconds the full scan may spend per map.")
+    parser.add_argument("--output", default="collision_benchmark.json", help="File to write the JSON results to.")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(value) for value in size.lower().split("x")) for size in args.sizes]
+    results = run_benchmark(sizes, args.queries, args.seed, args.time_budget)
+    with open(args.output, "w") as file:
+        json.dump({"seed": args.seed, "queries": args.queries, "results": results}, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
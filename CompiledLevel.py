@@ -0,0 +1,223 @@
+import os
+import sys
+import mmap
+import array
+import struct
+import hashlib
+import pytmx
+from pytmx.util_pygame import handle_transformation
+import MapGrid
+import AssetCache
+
+# Compiled levels are written by LevelCompiler.py. All numbers are little-endian.
+MAGIC = b"MZLV"
+VERSION = 1
+# magic, version, width, height, tile width, tile height, tilesets, tiles (maxgid), layers,
+# source files, SHA-1 of the source files, size of the navigation data
+HEADER = struct.Struct("<4sHHHHHHHHH20sI")
+TILESET = struct.Struct("<I")          # first GID, followed by the image source and colour key strings
+TILE = struct.Struct("<HIBHHHH")       # tileset index, Tiled GID, flip flags, rect in the tileset image
+LAYER = struct.Struct("<BI")           # visible, number of occupied cells; after the name string
+CELL = struct.Struct("<HH")            # x, y of an occupied cell
+STRING_LENGTH = struct.Struct("<H")
+NO_TILESET = 0xFFFF
+
+
+def get_source_hash(map_directory, sources):
+    """SHA-1 of the TMX and TSX files a level was compiled from (paths relative to the map)."""
+    digest = hashlib.sha1()
+    for source in sources:
+        digest.update(source.encode("utf-8"))
+        with open(os.path.join(map_directory, source), "rb") as file:
+            digest.update(file.read())
+    return digest.digest()
+
+
+def pack_flags(flags):
+    return flags.flipped_horizontally | flags.flipped_vertically << 1 | flags.flipped_diagonally << 2
+
+
+def unpack_flags(bits):
+    return pytmx.TileFlags(bits & 1, bits >> 1 & 1, bits >> 2 & 1)
+
+
+class CompiledTileset:
+
+    def __init__(self, firstgid, source, trans):
+        self.firstgid = firstgid
+        self.source = source   # Tileset image, relative to the map directory (like pytmx)
+        self.trans = trans     # Colour key, or None
+
+
+class CompiledLayer:
+
+    def __init__(self, name, visible, data, occupied_cells):
+        """
+        A tile layer with the parts of pytmx.TiledTileLayer the game uses:
+        data[y][x] is the GID of a cell and iterating yields (x, y, gid).
+        """
+        self.name = name
+        self.visible = visible
+        self.data = data                       # Rows of GIDs, views into the mapped file
+        self.occupied_cells = occupied_cells   # (x, y) of every cell with a tile
+        self.height = len(data)
+        self.width = len(data[0]) if data else 0
+
+
+    def __iter__(self):
+        for y, row in enumerate(self.data):
+            for x, gid in enumerate(row):
+                yield x, y, gid
+
+
+class CompiledLevel:
+
+    def __init__(self, filename):
+        """
+        Memory-maps a compiled level and loads its tile images. Offers the parts of
+        pytmx.TiledMap that MapRenderer and CollisionManager use, so either can be
+        handed to them. Raises ValueError if the file is not a valid compiled level.
+        """
+        self.filename = filename
+        with open(filename, "rb") as file:
+            # A private copy-on-write mapping: tiles can still be cleared in memory.
+            self.mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self.offset = 0
+
+        if len(self.mapped) < HEADER.size:
+            raise ValueError("file is truncated")
+        (magic, version, self.width, self.height, self.tilewidth, self.tileheight, tileset_count,
+         self.maxgid, layer_count, source_count, self.source_hash, navigation_size) = self.read(HEADER)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a compiled level of this version")
+
+        self.sources = [self.read_string() for i in range(source_count)]
+
+        self.tilesets = []
+        for i in range(tileset_count):
+            firstgid, = self.read(TILESET)
+            source = self.read_string()
+            trans = self.read_string() or None
+            self.tilesets.append(CompiledTileset(firstgid, source, trans))
+
+        self.tiles = [self.read(TILE) for gid in range(self.maxgid)]
+        self.gidmap = {}
+        self.tiledgidmap = {}
+        for gid, (tileset_index, tiled_gid, flags, x, y, w, h) in enumerate(self.tiles):
+            if tileset_index != NO_TILESET:
+                self.gidmap.setdefault(tiled_gid, []).append((gid, unpack_flags(flags)))
+                self.tiledgidmap[gid] = tiled_gid
+
+        self.layers = []
+        for i in range(layer_count):
+            name = self.read_string()
+            visible, cell_count = self.read(LAYER)
+            occupied_cells = [self.read(CELL) for j in range(cell_count)]
+            self.align()
+            cells = self.read_view(self.width * self.height * 2)
+            if sys.byteorder == "big":
+                gids = array.array("H", cells.tobytes())
+                gids.byteswap()
+                cells = memoryview(gids)
+            else:
+                cells = cells.cast("H")
+            rows = [cells[y * self.width:(y + 1) * self.width] for y in range(self.height)]
+            self.layers.append(CompiledLayer(name, bool(visible), rows, occupied_cells))
+
+        self.walls = self.read_view((self.width * self.height + 7) // 8)   # Bitset of wall cells
+        self.navigation_data = self.read_view(navigation_size) if navigation_size else None
+        self.images = [None] * self.maxgid
+
+
+    def read(self, structure):
+        if self.offset + structure.size > len(self.mapped):
+            raise ValueError("file is truncated")
+        values = structure.unpack_from(self.mapped, self.offset)
+        self.offset += structure.size
+        return values
+
+
+    def read_string(self):
+        length, = self.read(STRING_LENGTH)
+        return self.read_view(length).tobytes().decode("utf-8")
+
+
+    def read_view(self, size):
+        if self.offset + size > len(self.mapped):
+            raise ValueError("file is truncated")
+        view = memoryview(self.mapped)[self.offset:self.offset + size]
+        self.offset += size
+        return view
+
+
+    def align(self):
+        # GID arrays start on an even offset.
+        self.offset += self.offset % 2
+
+
+    def is_stale(self, map_directory):
+        try:
+            return get_source_hash(map_directory, self.sources) != self.source_hash
+        except OSError:
+            return True
+
+
+    def load_images(self, map_directory):
+        """
+        Cuts every tile out of its tileset image the same way MapRenderer.decoding_image_loader
+        does, leaving it in the file's format for MapRenderer.convert_tiles(). The tileset images
+        come from the asset cache, so levels sharing a tileset decode it once.
+        """
+        for gid, (tileset_index, tiled_gid, flags, x, y, w, h) in enumerate(self.tiles):
+            if tileset_index == NO_TILESET:
+                continue
+            tileset = self.tilesets[tileset_index]
+            image = AssetCache.asset_cache.load_image(os.path.join(map_directory, tileset.source), mode=None)
+            self.images[gid] = handle_transformation(image.subsurface((x, y, w, h)), unpack_flags(flags))
+
+
+    @property
+    def visible_layers(self):
+        return (layer for layer in self.layers if layer.visible)
+
+
+    def get_tile_image_by_gid(self, gid):
+        if not 0 <= gid < self.maxgid:
+            raise ValueError(f"Invalid GID: {gid}")
+        return self.images[gid]
+
+
+    def get_tileset_from_gid(self, gid):
+        tileset_index = self.tiles[gid][0] if 0 <= gid < self.maxgid else NO_TILESET
+        if tileset_index == NO_TILESET:
+            raise ValueError("Tile GID not found")
+        return self.tilesets[tileset_index]
+
+
+    def get_map_grid(self):
+        # Walkability grid straight from the compiled wall bitset.
+        map = MapGrid.MapGrid(self.width, self.height)
+        for index in range(self.width * self.height):
+            if self.walls[index >> 3] >> (index & 7) & 1:
+                map.cells[index] = 1
+        return map
+
+
+def load_compiled_level(filename, map_directory):
+    """
+    Returns the CompiledLevel in filename with its images loaded, or None if there is
+    no compiled file, it is out of date with its TMX source, or it cannot be read.
+    map_directory: the directory of the TMX file, which the stored paths are relative to.
+    """
+    if not os.path.exists(filename):
+        return None
+    try:
+        level = CompiledLevel(filename)
+        if level.is_stale(map_directory):
+            print(f"Compiled level '{filename}' is out of date, loading the TMX file instead.")
+            return None
+        level.load_images(map_directory)
+        return level
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        print(f"Error loading compiled level '{filename}': {e}")
+        return None
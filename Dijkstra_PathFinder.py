@@ -1,11 +1,15 @@
 import heapq
+import MapGrid
 
 def dijkstra(grid, start_pos, target_pos):
-    # param grid: 2D list where 0 represents walkable and 1 represents a wall.
+    # param grid: MapGrid (or 2D list) where 0 represents walkable and 1 represents a wall.
     # param start_pos: Tuple (x, y) start coordinate.
     # param target_pos: Tuple (x, y) goal coordinate.
     # return: List of (x, y) tuples representing the path from start to goal, or None if no path exists.
     
+    grid = MapGrid.as_map_grid(grid)
+    cells, width, height = grid.cells, grid.width, grid.height
+    
     # Priority queue to store (cost, position) tuples
     priority_queue = []
     heapq.heappush(priority_queue, (0, start_pos))
@@ -32,10 +36,10 @@ def dijkstra(grid, start_pos, target_pos):
             neighbor_pos = (current_pos[0] + x_offset, current_pos[1] + y_offset)
             
             # Check if the neighbor is within grid bounds
-            if 0 <= neighbor_pos[0] < len(grid[0]) and 0 <= neighbor_pos[1] < len(grid):
+            if 0 <= neighbor_pos[0] < width and 0 <= neighbor_pos[1] < height:
                 
                 # Check if the neighbor is walkable
-                if grid[neighbor_pos[1]][neighbor_pos[0]] == 0:
+                if cells[neighbor_pos[1] * width + neighbor_pos[0]] == 0:
                     new_cost = cost_to_reach[current_pos] + 1
                     
                     # Update the path if this route is shorter
@@ -0,0 +1,181 @@
+import os
+import sys
+import array
+import struct
+import hashlib
+from collections import deque
+import MapGrid
+
+CACHE_DIRECTORY = os.path.join("Maps", "NavCache")   # Where the tables are cached between runs
+NO_CELL = 0xFFFF                                      # Marks walls, unreachable goals and "already there"
+MAGIC = b"MZNV"
+VERSION = 1
+HEADER = struct.Struct("<4sHHHH")   # magic, version, width, height, number of walkable cells
+
+
+class DistanceTable:
+
+    def __init__(self):
+        """
+        All-pairs next-hop and distance table for one level grid. Every walkable
+        cell gets a compact id; next_hop[start_id * count + goal_id] is the id of
+        the first cell to move to, so a path query is a single lookup.
+        """
+        self.width = 0
+        self.height = 0
+        self.count = 0                       # Number of walkable cells
+        self.cell_ids = array.array("H")     # Map cell (y * width + x) -> compact id, NO_CELL for walls
+        self.cells = []                      # Compact id -> (x, y)
+        self.next_hop = array.array("H")     # count * count compact ids
+        self.distance = array.array("H")     # count * count path lengths in tiles
+
+
+    @staticmethod
+    def get_grid_hash(grid):
+        # The grid is built from the TMX Walls layer, so this changes exactly when the walls change.
+        grid = MapGrid.as_map_grid(grid)
+        digest = hashlib.sha1(struct.pack("<HH", grid.width, grid.height))
+        digest.update(grid.cells)
+        return digest.hexdigest()
+
+
+    def prepare(self, grid):
+        """
+        Loads the table for this grid from the cache, or builds it and writes it to the cache.
+        """
+        filename = os.path.join(CACHE_DIRECTORY, f"{self.get_grid_hash(grid)}.nav")
+        if os.path.exists(filename):
+            try:
+                self.load(filename)
+                return
+            except (OSError, ValueError, EOFError) as e:
+                print(f"Error loading distance table '{filename}': {e}")
+        self.build(grid)
+        try:
+            os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+            self.save(filename)
+        except OSError as e:
+            print(f"Error saving distance table '{filename}': {e}")
+
+
+    def build(self, grid):
+        """ Runs one breadth-first search from every walkable cell. """
+        grid = MapGrid.as_map_grid(grid)
+        self.width = grid.width
+        self.height = grid.height
+        width, height = self.width, self.height
+
+        self.cell_ids = array.array("H", [NO_CELL]) * (width * height)
+        self.cells = []
+        for y in range(height):
+            for x in range(width):
+                if grid.cells[y * width + x] == 0:
+                    self.cell_ids[y * width + x] = len(self.cells)
+                    self.cells.append((x, y))
+        count = self.count = len(self.cells)
+        if count >= NO_CELL:
+            raise ValueError(f"Grid has too many walkable cells for a distance table ({count})")
+
+        self.next_hop = array.array("H", [NO_CELL]) * (count * count)
+        self.distance = array.array("H", [NO_CELL]) * (count * count)
+        cell_ids, next_hop, distance = self.cell_ids, self.next_hop, self.distance
+
+        for goal_id, (goal_x, goal_y) in enumerate(self.cells):
+            # Every cell reached from the goal moves to the cell it was reached from.
+            distance[goal_id * count + goal_id] = 0
+            queue = deque([(goal_x, goal_y, goal_id, 0)])
+            while queue:
+                x, y, cell_id, steps = queue.popleft()
+                for x_offset, y_offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    nx, ny = x + x_offset, y + y_offset
+                    if 0 <= nx < width and 0 <= ny < height:
+                        neighbour_id = cell_ids[ny * width + nx]
+                        if neighbour_id != NO_CELL and distance[neighbour_id * count + goal_id] == NO_CELL:
+                            distance[neighbour_id * count + goal_id] = steps + 1
+                            next_hop[neighbour_id * count + goal_id] = cell_id
+                            queue.append((nx, ny, neighbour_id, steps + 1))
+
+
+    def save(self, filename):
+        with open(filename, "wb") as file:
+            self.write(file)
+
+
+    def write(self, file):
+        # Writes the table to an open binary file (also used to embed it in compiled levels).
+        file.write(HEADER.pack(MAGIC, VERSION, self.width, self.height, self.count))
+        for table in (self.cell_ids, self.next_hop, self.distance):
+            if sys.byteorder == "big":
+                table = array.array("H", table)
+                table.byteswap()   # The file is always little-endian
+            file.write(table.tobytes())
+
+
+    def load(self, filename):
+        with open(filename, "rb") as file:
+            self.load_buffer(file.read())
+
+
+    def load_buffer(self, buffer):
+        """
+        Loads a table written by write() from a bytes-like object. On little-endian
+        machines the tables are views into the buffer, so a memory-mapped buffer
+        is used in place without copying.
+        """
+        buffer = memoryview(buffer)
+        if len(buffer) < HEADER.size:
+            raise ValueError("distance table is truncated")
+        magic, version, width, height, count = HEADER.unpack_from(buffer)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a distance table of this version")
+        tables = []
+        offset = HEADER.size
+        for size in (width * height, count * count, count * count):
+            data = buffer[offset:offset + size * 2]
+            if len(data) != size * 2:
+                raise ValueError("distance table is truncated")
+            if sys.byteorder == "big":
+                table = array.array("H", data.tobytes())
+                table.byteswap()
+            else:
+                table = data.cast("H")
+            tables.append(table)
+            offset += size * 2
+        self.width, self.height, self.count = width, height, count
+        self.cell_ids, self.next_hop, self.distance = tables
+        self.cells = [None] * self.count
+        for index, cell_id in enumerate(self.cell_ids):
+            if cell_id != NO_CELL:
+                self.cells[cell_id] = (index % self.width, index // self.width)
+
+
+    def get_cell_id(self, position):
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.cell_ids[y * self.width + x]
+        return NO_CELL
+
+
+    def get_next_step(self, start, goal):
+        """
+        Returns the next tile (x, y) to move to from start towards goal,
+        or None if start is the goal or the goal cannot be reached.
+        """
+        goal_id = self.get_cell_id(goal)
+        if goal_id == NO_CELL or start == goal:
+            return None
+        start_id = self.get_cell_id(start)
+        if start_id != NO_CELL:
+            hop = self.next_hop[start_id * self.count + goal_id]
+            return self.cells[hop] if hop != NO_CELL else None
+
+        # The start tile is a wall (an enemy brushing against one): step to the best walkable neighbour.
+        best_step = None
+        best_distance = NO_CELL
+        for x_offset, y_offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            neighbour = (start[0] + x_offset, start[1] + y_offset)
+            neighbour_id = self.get_cell_id(neighbour)
+            if neighbour_id != NO_CELL and self.distance[neighbour_id * self.count + goal_id] < best_distance:
+                best_step = neighbour
+                best_distance = self.distance[neighbour_id * self.count + goal_id]
+        return best_step
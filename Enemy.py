@@ -1,7 +1,6 @@
 import pygame
-import time
-import AStar_PathFinder
-import Dijkstra_PathFinder
+import GameClock
+import AssetCache
 
 class Enemy(pygame.sprite.Sprite):
     # Define enemy type attributes
@@ -10,192 +9,191 @@ class Enemy(pygame.sprite.Sprite):
         "skeleton": {"HP": 50, "speed": 56, "damage_amount": 15, "damage_frequency": 2, "detection_radius": 15},
     }
     
-    def __init__(self, position, enemy_type="zombie"):
-        super().__init__()
-        # Validate enemy type; default to "zombie" if unknown.
-        if enemy_type not in Enemy.enemyTypes:
-            enemy_type = "zombie"
-        self.enemy_type = enemy_type
-        # Position as a vector for smooth movement.
-        self.position = pygame.math.Vector2(position)   # Tuple (x, y) for spawn location.
-        self.direction = "down"  # starting facing direction
-        
-        # Set attributes based on enemy type.
-        attributes = Enemy.enemyTypes[self.enemy_type]
-        self.HP = attributes["HP"]
-        self.speed = attributes["speed"]
-        self.damage_amount = attributes["damage_amount"]
-        self.damage_frequency = attributes["damage_frequency"]
-        self.detection_radius = attributes["detection_radius"]  # in tiles
-        
-        # Define all the animations for zombie and skeleton
-        zombie_animations = {
+    # Paths of the animation frames for zombie and skeleton
+    animationPaths = {
+        "zombie": {
             "idle_left": [
-                pygame.image.load("Sprites/Zombie/Idle/left_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/left_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/left_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/left_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/left_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/left_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/left_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/left_8.png").convert_alpha(),
+                "Sprites/Zombie/Idle/left_1.png",
+                "Sprites/Zombie/Idle/left_2.png",
+                "Sprites/Zombie/Idle/left_3.png",
+                "Sprites/Zombie/Idle/left_4.png",
+                "Sprites/Zombie/Idle/left_5.png",
+                "Sprites/Zombie/Idle/left_6.png",
+                "Sprites/Zombie/Idle/left_7.png",
+                "Sprites/Zombie/Idle/left_8.png",
             ],
             "idle_right": [
-                pygame.image.load("Sprites/Zombie/Idle/right_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/right_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/right_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/right_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/right_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/right_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/right_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Idle/right_8.png").convert_alpha(),
+                "Sprites/Zombie/Idle/right_1.png",
+                "Sprites/Zombie/Idle/right_2.png",
+                "Sprites/Zombie/Idle/right_3.png",
+                "Sprites/Zombie/Idle/right_4.png",
+                "Sprites/Zombie/Idle/right_5.png",
+                "Sprites/Zombie/Idle/right_6.png",
+                "Sprites/Zombie/Idle/right_7.png",
+                "Sprites/Zombie/Idle/right_8.png",
             ],
             "walking_left": [
-                pygame.image.load("Sprites/Zombie/Walking/left_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/left_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/left_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/left_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/left_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/left_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/left_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/left_8.png").convert_alpha(),
+                "Sprites/Zombie/Walking/left_1.png",
+                "Sprites/Zombie/Walking/left_2.png",
+                "Sprites/Zombie/Walking/left_3.png",
+                "Sprites/Zombie/Walking/left_4.png",
+                "Sprites/Zombie/Walking/left_5.png",
+                "Sprites/Zombie/Walking/left_6.png",
+                "Sprites/Zombie/Walking/left_7.png",
+                "Sprites/Zombie/Walking/left_8.png",
             ],
             "walking_right": [
-                pygame.image.load("Sprites/Zombie/Walking/right_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/right_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/right_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/right_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/right_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/right_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/right_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Walking/right_8.png").convert_alpha(),
+                "Sprites/Zombie/Walking/right_1.png",
+                "Sprites/Zombie/Walking/right_2.png",
+                "Sprites/Zombie/Walking/right_3.png",
+                "Sprites/Zombie/Walking/right_4.png",
+                "Sprites/Zombie/Walking/right_5.png",
+                "Sprites/Zombie/Walking/right_6.png",
+                "Sprites/Zombie/Walking/right_7.png",
+                "Sprites/Zombie/Walking/right_8.png",
             ],
             "attacking_left": [
-                pygame.image.load("Sprites/Zombie/Attacking/left_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/left_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/left_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/left_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/left_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/left_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/left_7.png").convert_alpha(),
+                "Sprites/Zombie/Attacking/left_1.png",
+                "Sprites/Zombie/Attacking/left_2.png",
+                "Sprites/Zombie/Attacking/left_3.png",
+                "Sprites/Zombie/Attacking/left_4.png",
+                "Sprites/Zombie/Attacking/left_5.png",
+                "Sprites/Zombie/Attacking/left_6.png",
+                "Sprites/Zombie/Attacking/left_7.png",
             ],
             "attacking_right": [
-                pygame.image.load("Sprites/Zombie/Attacking/right_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/right_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/right_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/right_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/right_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/right_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Zombie/Attacking/right_7.png").convert_alpha(),
+                "Sprites/Zombie/Attacking/right_1.png",
+                "Sprites/Zombie/Attacking/right_2.png",
+                "Sprites/Zombie/Attacking/right_3.png",
+                "Sprites/Zombie/Attacking/right_4.png",
+                "Sprites/Zombie/Attacking/right_5.png",
+                "Sprites/Zombie/Attacking/right_6.png",
+                "Sprites/Zombie/Attacking/right_7.png",
             ],
-        }
-    
-        skeleton_animations = {
+        },
+        "skeleton": {
             "idle_left": [
-                pygame.image.load("Sprites/Skeleton/Idle/left_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_8.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_9.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_10.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/left_11.png").convert_alpha(),
+                "Sprites/Skeleton/Idle/left_1.png",
+                "Sprites/Skeleton/Idle/left_2.png",
+                "Sprites/Skeleton/Idle/left_3.png",
+                "Sprites/Skeleton/Idle/left_4.png",
+                "Sprites/Skeleton/Idle/left_5.png",
+                "Sprites/Skeleton/Idle/left_6.png",
+                "Sprites/Skeleton/Idle/left_7.png",
+                "Sprites/Skeleton/Idle/left_8.png",
+                "Sprites/Skeleton/Idle/left_9.png",
+                "Sprites/Skeleton/Idle/left_10.png",
+                "Sprites/Skeleton/Idle/left_11.png",
             ],
             "idle_right": [
-                pygame.image.load("Sprites/Skeleton/Idle/right_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_8.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_9.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_10.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Idle/right_11.png").convert_alpha(),
+                "Sprites/Skeleton/Idle/right_1.png",
+                "Sprites/Skeleton/Idle/right_2.png",
+                "Sprites/Skeleton/Idle/right_3.png",
+                "Sprites/Skeleton/Idle/right_4.png",
+                "Sprites/Skeleton/Idle/right_5.png",
+                "Sprites/Skeleton/Idle/right_6.png",
+                "Sprites/Skeleton/Idle/right_7.png",
+                "Sprites/Skeleton/Idle/right_8.png",
+                "Sprites/Skeleton/Idle/right_9.png",
+                "Sprites/Skeleton/Idle/right_10.png",
+                "Sprites/Skeleton/Idle/right_11.png",
             ],
             "walking_left": [
-                pygame.image.load("Sprites/Skeleton/Walking/left_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_8.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_9.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_10.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_11.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_12.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/left_13.png").convert_alpha(),
+                "Sprites/Skeleton/Walking/left_1.png",
+                "Sprites/Skeleton/Walking/left_2.png",
+                "Sprites/Skeleton/Walking/left_3.png",
+                "Sprites/Skeleton/Walking/left_4.png",
+                "Sprites/Skeleton/Walking/left_5.png",
+                "Sprites/Skeleton/Walking/left_6.png",
+                "Sprites/Skeleton/Walking/left_7.png",
+                "Sprites/Skeleton/Walking/left_8.png",
+                "Sprites/Skeleton/Walking/left_9.png",
+                "Sprites/Skeleton/Walking/left_10.png",
+                "Sprites/Skeleton/Walking/left_11.png",
+                "Sprites/Skeleton/Walking/left_12.png",
+                "Sprites/Skeleton/Walking/left_13.png",
             ],
             "walking_right": [
-                pygame.image.load("Sprites/Skeleton/Walking/right_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_8.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_9.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_10.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_11.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_12.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Walking/right_13.png").convert_alpha(),
+                "Sprites/Skeleton/Walking/right_1.png",
+                "Sprites/Skeleton/Walking/right_2.png",
+                "Sprites/Skeleton/Walking/right_3.png",
+                "Sprites/Skeleton/Walking/right_4.png",
+                "Sprites/Skeleton/Walking/right_5.png",
+                "Sprites/Skeleton/Walking/right_6.png",
+                "Sprites/Skeleton/Walking/right_7.png",
+                "Sprites/Skeleton/Walking/right_8.png",
+                "Sprites/Skeleton/Walking/right_9.png",
+                "Sprites/Skeleton/Walking/right_10.png",
+                "Sprites/Skeleton/Walking/right_11.png",
+                "Sprites/Skeleton/Walking/right_12.png",
+                "Sprites/Skeleton/Walking/right_13.png",
             ],
             "attacking_left": [
-                pygame.image.load("Sprites/Skeleton/Attacking/left_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_8.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_9.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_10.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_11.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_12.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_13.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_14.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_15.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_16.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_17.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/left_18.png").convert_alpha(),
+                "Sprites/Skeleton/Attacking/left_1.png",
+                "Sprites/Skeleton/Attacking/left_2.png",
+                "Sprites/Skeleton/Attacking/left_3.png",
+                "Sprites/Skeleton/Attacking/left_4.png",
+                "Sprites/Skeleton/Attacking/left_5.png",
+                "Sprites/Skeleton/Attacking/left_6.png",
+                "Sprites/Skeleton/Attacking/left_7.png",
+                "Sprites/Skeleton/Attacking/left_8.png",
+                "Sprites/Skeleton/Attacking/left_9.png",
+                "Sprites/Skeleton/Attacking/left_10.png",
+                "Sprites/Skeleton/Attacking/left_11.png",
+                "Sprites/Skeleton/Attacking/left_12.png",
+                "Sprites/Skeleton/Attacking/left_13.png",
+                "Sprites/Skeleton/Attacking/left_14.png",
+                "Sprites/Skeleton/Attacking/left_15.png",
+                "Sprites/Skeleton/Attacking/left_16.png",
+                "Sprites/Skeleton/Attacking/left_17.png",
+                "Sprites/Skeleton/Attacking/left_18.png",
             ],
             "attacking_right": [
-                pygame.image.load("Sprites/Skeleton/Attacking/right_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_8.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_9.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_10.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_11.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_12.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_13.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_14.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_15.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_16.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_17.png").convert_alpha(),
-                pygame.image.load("Sprites/Skeleton/Attacking/right_18.png").convert_alpha(),
+                "Sprites/Skeleton/Attacking/right_1.png",
+                "Sprites/Skeleton/Attacking/right_2.png",
+                "Sprites/Skeleton/Attacking/right_3.png",
+                "Sprites/Skeleton/Attacking/right_4.png",
+                "Sprites/Skeleton/Attacking/right_5.png",
+                "Sprites/Skeleton/Attacking/right_6.png",
+                "Sprites/Skeleton/Attacking/right_7.png",
+                "Sprites/Skeleton/Attacking/right_8.png",
+                "Sprites/Skeleton/Attacking/right_9.png",
+                "Sprites/Skeleton/Attacking/right_10.png",
+                "Sprites/Skeleton/Attacking/right_11.png",
+                "Sprites/Skeleton/Attacking/right_12.png",
+                "Sprites/Skeleton/Attacking/right_13.png",
+                "Sprites/Skeleton/Attacking/right_14.png",
+                "Sprites/Skeleton/Attacking/right_15.png",
+                "Sprites/Skeleton/Attacking/right_16.png",
+                "Sprites/Skeleton/Attacking/right_17.png",
+                "Sprites/Skeleton/Attacking/right_18.png",
             ],
-        }
+        },
+    }
+    
+    def __init__(self, position, enemy_type="zombie"):
+        super().__init__()
+        # Validate enemy type; default to "zombie" if unknown.
+        if enemy_type not in Enemy.enemyTypes:
+            enemy_type = "zombie"
+        self.enemy_type = enemy_type
+        # Position as a vector for smooth movement.
+        self.position = pygame.math.Vector2(position)   # Tuple (x, y) for spawn location.
+        self.direction = "down"  # starting facing direction
+        
+        # Set attributes based on enemy type.
+        attributes = Enemy.enemyTypes[self.enemy_type]
+        self.HP = attributes["HP"]
+        self.speed = attributes["speed"]
+        self.damage_amount = attributes["damage_amount"]
+        self.damage_frequency = attributes["damage_frequency"]
+        self.detection_radius = attributes["detection_radius"]  # in tiles
         
         # TODO DESIGN ANIMATIONS FOR THE BOSS
         
-        # Load animations for zombie or skleleton.
-        if self.enemy_type == 'zombie':
-            self.animations = zombie_animations
-        elif self.enemy_type == 'skeleton':
-            self.animations = skeleton_animations
+        # Load animations for zombie or skleleton. Frames come from the shared asset cache,
+        # so only the first enemy of each type decodes them from disk.
+        self.animations = AssetCache.asset_cache.load_animations(Enemy.animationPaths[self.enemy_type])
         
         # Start with the idle animation image.
         self.image = self.animations["idle_right"][0]
@@ -215,8 +213,8 @@ class Enemy(pygame.sprite.Sprite):
         self.lastAttackTime = 0  # for managing attack frequency
 
 
-    def update(self, dt, player, health_system, collision_manager, bullet_manager, audio_manager):
-        self.updateBehaviour(player, collision_manager, health_system, bullet_manager, audio_manager, dt)
+    def update(self, dt, player, health_system, collision_manager, path_finder):
+        self.updateBehaviour(player, collision_manager, health_system, path_finder, dt)
         self.updateAnimation(dt)
         # Update the rect and hitbox to match the new position.
         self.rect.center = self.position
@@ -224,7 +222,7 @@ class Enemy(pygame.sprite.Sprite):
         self.collision_rect.center = self.position
 
 
-    def updateBehaviour(self, player, collision_manager, health_system, bullet_manager, audio_manager, dt):
+    def updateBehaviour(self, player, collision_manager, health_system, path_finder, dt):
         # Calculate distance to the player.
         player_center = pygame.math.Vector2(player.position.x + 16, player.position.y + 16)
         distance_to_player = self.position.distance_to(player_center)
@@ -235,25 +233,25 @@ class Enemy(pygame.sprite.Sprite):
             if player.inside_safe_spot:
                 self.idle()
             else:
-                self.pursuePlayer(player, collision_manager, health_system, bullet_manager, audio_manager, dt)
+                self.pursuePlayer(player, collision_manager, health_system, path_finder, dt)
         else:
             self.idle()
 
     
-    def pursuePlayer(self, player, collision_manager, health_system, bullet_manager, audio_manager, dt):
+    def pursuePlayer(self, player, collision_manager, health_system, path_finder, dt):
         start = self.get_grid_position()  # Convert enemy position to grid coordinates.
         goal = player.get_grid_position()   # Convert player position to grid coordinates.
         start_midpoint = pygame.math.Vector2((start[0] * 32 + 16, start[1] * 32 + 16 + 48))    
-        path = Dijkstra_PathFinder.dijkstra(collision_manager.map_grid, start, goal)
-        # IMPLEMENTAION IF I USE A STAR LATER INSTEAD: write  A_STAR_PathFinder.a_star()
+        # The pathfinding engine is shared by all enemies and chosen per level (see PathFinder.LEVEL_PATH_FINDERS).
+        next_step = path_finder.get_next_step(collision_manager.map_grid, start, goal)
         
         # Save the current position for collision resolution.
         prev_x = self.position.x
         prev_y = self.position.y
         
-        if path:
+        if next_step:
             # Move toward the next waypoint in the path.
-            next_waypoint = pygame.math.Vector2((path[0][0] * 32 + 16, path[0][1] * 32 + 16 + 48))
+            next_waypoint = pygame.math.Vector2((next_step[0] * 32 + 16, next_step[1] * 32 + 16 + 48))
 
             wall_collisions = collision_manager.check_wall_collisions(self)
             if wall_collisions:
@@ -281,22 +279,16 @@ class Enemy(pygame.sprite.Sprite):
                 self.rect.center = self.position
                 self.collision_rect = pygame.Rect(0, 0, self.rect.width - 2, self.rect.height - 2)
                 self.collision_rect.center = self.position
-            
-            # Check if a bullet hits the enemy
-            for bullet in bullet_manager.bullets.copy():
-                if collision_manager.check_sprite_collision(self, bullet):
-                    self.takeDamage(bullet.damage)
-                    audio_manager.playSoundEffect("bullet_hit")
                 
             # If close enough to the player, attempt to attack.
             player_center = pygame.math.Vector2(player.position.x + 16, player.position.y + 16)
             if self.position.distance_to(player_center) < 40:
-                self.attackPlayer(health_system, audio_manager)
+                self.attackPlayer(health_system)
             else:
                 self.animation_state = "walking"
         else:
             if start == goal:
-                self.attackPlayer(health_system, audio_manager)
+                self.attackPlayer(health_system)
             # No valid path found; so idle.
             else:
                 self.idle()
@@ -308,12 +300,12 @@ class Enemy(pygame.sprite.Sprite):
         return (tile_position_x, tile_position_y)
     
     
-    def attackPlayer(self, health_system, audio_manager):
+    def attackPlayer(self, health_system):
         # Attack the player if enough time has passed since the last attack.
-        current_time = time.time()
+        current_time = GameClock.clock.now()
         if (current_time - self.lastAttackTime) >= self.damage_frequency:
             # Calling the health system’s take_damage() method.
-            health_system.take_damage(self.damage_amount, audio_manager)
+            health_system.take_damage(self.damage_amount)
             self.lastAttackTime = current_time
         self.animation_state = "attacking"
     
@@ -322,6 +314,11 @@ class Enemy(pygame.sprite.Sprite):
         self.animation_state = "idle"
     
     
+    def hitByBullet(self, damage):
+        # Called by the collision stage once for every bullet that hits this enemy.
+        self.takeDamage(damage)
+    
+    
     def takeDamage(self, amount):
         # Reduce HP by the given amount. If HP is depleted, remove the enemy.
         self.HP -= amount
@@ -0,0 +1,89 @@
+from collections import deque
+import MapGrid
+
+class FlowField:
+
+    def __init__(self):
+        """
+        A distance field shared by all enemies. It is rebuilt with a single reverse BFS
+        from the player's tile, and only when the player moves to a different tile.
+        """
+        self.grid = None        # The walkability grid the field was built for (0 = walkable, 1 = wall).
+        self.map_grid = None    # The same grid as a MapGrid.
+        self.goal = None        # Tuple (x, y) of the tile the field points to.
+        self.width = 0
+        self.height = 0
+        self.distances = []     # Flat list (index = y * width + x) of steps to the goal, -1 if unreachable.
+        self.dirty = True       # Set when the goal changes; the BFS is run lazily on the next query.
+
+
+    def set_goal(self, grid, goal):
+        # Only invalidate the field if the grid or the goal tile actually changed.
+        if grid is not self.grid or goal != self.goal:
+            if grid is not self.grid:
+                self.map_grid = MapGrid.as_map_grid(grid)
+            self.grid = grid
+            self.goal = goal
+            self.dirty = True
+
+
+    def build(self):
+        """ Runs one breadth-first search outwards from the goal tile. """
+        cells = self.map_grid.cells
+        self.width = self.map_grid.width
+        self.height = self.map_grid.height
+        width, height = self.width, self.height
+        self.distances = [-1] * (width * height)
+        self.dirty = False
+
+        goal_x, goal_y = self.goal
+        # A goal outside the map or inside a wall cannot be reached.
+        if not (0 <= goal_x < width and 0 <= goal_y < height) or cells[goal_y * width + goal_x] != 0:
+            return
+
+        distances = self.distances
+        distances[goal_y * width + goal_x] = 0
+        queue = deque([(goal_x, goal_y)])
+        while queue:
+            x, y = queue.popleft()
+            next_distance = distances[y * width + x] + 1
+            for x_offset, y_offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                nx, ny = x + x_offset, y + y_offset
+                index = ny * width + nx
+                if 0 <= nx < width and 0 <= ny < height and cells[index] == 0:
+                    if distances[index] == -1:
+                        distances[index] = next_distance
+                        queue.append((nx, ny))
+
+
+    def get_distance(self, position):
+        # Returns the number of steps from position to the goal, or -1 if there is no path.
+        if self.dirty:
+            self.build()
+        x, y = position
+        if 0 <= x < self.width and 0 <= y < self.height:
+            return self.distances[y * self.width + x]
+        return -1
+
+
+    def get_next_step(self, grid, start, goal):
+        """
+        Returns the next tile (x, y) to move to from start towards goal,
+        or None if start is the goal or the goal cannot be reached.
+        """
+        self.set_goal(grid, goal)
+        if start == goal:
+            return None
+        if self.dirty:
+            self.build()
+
+        # Follow the field downhill: pick the neighbour closest to the goal.
+        best_step = None
+        best_distance = -1
+        for x_offset, y_offset in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            neighbour = (start[0] + x_offset, start[1] + y_offset)
+            distance = self.get_distance(neighbour)
+            if distance != -1 and (best_distance == -1 or distance < best_distance):
+                best_step = neighbour
+                best_distance = distance
+        return best_step
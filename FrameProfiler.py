@@ -0,0 +1,107 @@
+import time
+from collections import deque
+import pygame
+
+WHITE = (255, 255, 255)
+PANEL_COLOUR = (0, 0, 0)
+
+class FrameProfiler:
+
+    def __init__(self, history=300):
+        """
+        Measures where each frame's time goes. Code marks the end of each phase with
+        mark(phase); the overlay shows rolling frame time percentiles and the average
+        time per phase. While disabled every call returns straight away.
+        """
+        self.enabled = False
+        self.history = history
+        self.frame_times = deque(maxlen=history)   # Total time of the last frames, in seconds
+        self.phase_times = {}                      # Phase name -> deque of its time in the last frames
+        self.current_phases = {}                   # Phase name -> time spent in it during this frame
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+        self.in_frame = False   # Whether begin_frame() ran while enabled, i.e. this frame is being measured
+        self.font = None
+
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        # Start from a clean history so old numbers are not mixed with new ones.
+        self.frame_times.clear()
+        self.phase_times = {}
+        self.current_phases = {}
+        # Toggling happens part way through a frame: its times would be measured from a
+        # stale start, so nothing is recorded until the next begin_frame().
+        self.in_frame = False
+        self.frame_start = self.last_mark = time.perf_counter()
+
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.current_phases = {}
+        self.in_frame = True
+
+
+    def mark(self, phase):
+        """Adds the time since the previous mark to the given phase."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.current_phases[phase] = self.current_phases.get(phase, 0.0) + now - self.last_mark
+        self.last_mark = now
+
+
+    def end_frame(self):
+        if not self.enabled or not self.in_frame:
+            return
+        self.in_frame = False
+        self.frame_times.append(time.perf_counter() - self.frame_start)
+        for phase, seconds in self.current_phases.items():
+            if phase not in self.phase_times:
+                self.phase_times[phase] = deque(maxlen=self.history)
+            self.phase_times[phase].append(seconds)
+
+
+    def get_percentile(self, percentile):
+        """Returns the given percentile (0-100) of the recent frame times, in seconds."""
+        if not self.frame_times:
+            return 0.0
+        ordered = sorted(self.frame_times)
+        index = min(int(len(ordered) * percentile / 100), len(ordered) - 1)
+        return ordered[index]
+
+
+    def draw(self, screen):
+        """
+        Draws the overlay in the top left corner of the map and returns the area it covers.
+        The panel is opaque, so it can be drawn again over the last frame's panel.
+        """
+        if not self.enabled:
+            return None
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+
+        # Each line is a label and a value, drawn in two columns.
+        lines = [
+            ("frame p50 / p95 / p99", f"{self.get_percentile(50) * 1000:.2f} / "
+                                      f"{self.get_percentile(95) * 1000:.2f} / "
+                                      f"{self.get_percentile(99) * 1000:.2f} ms"),
+        ]
+        for phase, times in self.phase_times.items():
+            lines.append((phase, f"{sum(times) / len(times) * 1000:.2f} ms"))
+
+        line_height = self.font.get_linesize()
+        panel = pygame.Surface((400, line_height * len(lines) + 8))
+        panel.fill(PANEL_COLOUR)
+        for i, (label, value) in enumerate(lines):
+            y = 4 + i * line_height
+            panel.blit(self.font.render(label, True, WHITE), (6, y))
+            value_text = self.font.render(value, True, WHITE)
+            panel.blit(value_text, (panel.get_width() - 6 - value_text.get_width(), y))
+        return screen.blit(panel, (8, 56))
+
+
+# The single profiler shared by the whole process.
+profiler = FrameProfiler()
@@ -0,0 +1,38 @@
+import time
+
+class GameClock:
+
+    def __init__(self):
+        """
+        The time source used for cooldowns (shooting, enemy attacks). By default it is
+        the wall clock; a fixed-step simulation switches it to simulated time.
+        """
+        self.simulated = False   # True while the clock is driven by advance() instead of time.time()
+        self.sim_time = 0.0      # Current simulated time in seconds
+
+
+    def now(self):
+        """Returns the current time in seconds."""
+        if self.simulated:
+            return self.sim_time
+        return time.time()
+
+
+    def start_simulation(self, start_time=1000000.0):
+        # Start far away from 0 so the first shot / attack is never blocked by the
+        # initial "last time" values of 0, the same as with the wall clock.
+        self.simulated = True
+        self.sim_time = start_time
+
+
+    def advance(self, dt):
+        """Moves simulated time forward by dt seconds."""
+        self.sim_time += dt
+
+
+    def stop_simulation(self):
+        self.simulated = False
+
+
+# The single clock shared by the whole process.
+clock = GameClock()
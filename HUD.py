@@ -1,7 +1,18 @@
 import pygame
+import AssetCache
 WHITE = (255, 255, 255)
 
 class HUD:
+    # Cache keys (path, mode, size) of the HUD icons
+    imageKeys = {
+        "hp": ("Images\\HUD_heart.png", "opaque", (46, 46)),
+        "timer": ("Images\\HUD_timer.png", "opaque", (46, 46)),
+        "bullets": ("Images\\HUD_bullets.png", "opaque", (72, 36)),
+    }
+    # Where each field's icon and text go on the HUD. The text has simple
+    # padding ((48-32)/2 = 8 pixels, and + 1 for adjustment)
+    iconPositions = {"hp": (100, 1), "timer": (570, 1), "bullets": (1000, 6)}
+    textPositions = {"hp": (180, 9), "timer": (640, 9), "bullets": (1100, 9)}
     
     def __init__(self, initial_hp, start_time, font, initial_bullets=20):
         self.hp = initial_hp      # The starting health points
@@ -9,28 +20,74 @@ class HUD:
         self.bullets = initial_bullets # The starting bullet count
         self.font = font  # A Pygame font object for rendering text.
         # Loading all the 3 hud images and scaling them to the required size
-        self.hp_image = pygame.image.load("Images\\HUD_heart.png").convert()
-        self.hp_image = pygame.transform.scale(self.hp_image, (46, 46))
-        self.timer_image = pygame.image.load("Images\\HUD_timer.png").convert()
-        self.timer_image = pygame.transform.scale(self.timer_image, (46, 46))
-        self.bullets_image = pygame.image.load("Images\\HUD_bullets.png").convert()
-        self.bullets_image = pygame.transform.scale(self.bullets_image, (72, 36))
+        self.hp_image = AssetCache.asset_cache.load_image(*HUD.imageKeys["hp"])
+        self.timer_image = AssetCache.asset_cache.load_image(*HUD.imageKeys["timer"])
+        self.bullets_image = AssetCache.asset_cache.load_image(*HUD.imageKeys["bullets"])
+        self.icon_rects = {"hp": self.hp_image.get_rect(topleft=HUD.iconPositions["hp"]),
+                           "timer": self.timer_image.get_rect(topleft=HUD.iconPositions["timer"]),
+                           "bullets": self.bullets_image.get_rect(topleft=HUD.iconPositions["bullets"])}
+        
+        # A field's text is only rendered again when its value changes
+        self.text_surfaces = {}   # Rendered text surfaces by their text
+        self.field_texts = {name: None for name in HUD.textPositions}   # Text of each field
+        self.field_surfaces = {name: None for name in HUD.textPositions}
+        self.field_rects = {name: pygame.Rect(position, (0, 0)) for name, position in HUD.textPositions.items()}
+        self.dirty_rects = []     # Screen areas of fields changed since the last pop_dirty_rects()
 
 
-    def display_hud(self, screen):
-        # Rendering the text
-        hp_text = self.font.render(str(self.hp), True, WHITE)
-        timer_text = self.font.render(self.format_time(self.timer), True, WHITE)
-        bullets_text = self.font.render(str(self.bullets), True, WHITE)
-        
-        # Positioning with simple padding ((48-32)/2 = 8 pixels, and + 1 for adjustment)
-        screen.blit(hp_text, (180, 9))   # HP at the top left
-        screen.blit(timer_text, (640, 9))  # Timer at the top center
-        screen.blit(bullets_text, (1100, 9))  # Bullets at the top right
-        # Displaying the images
-        screen.blit(self.hp_image, (100, 1))
-        screen.blit(self.timer_image, (570, 1))
-        screen.blit(self.bullets_image, (1000, 6))
+    def display_hud(self, screen, repainted_rects=None):
+        """
+        Draws the HUD over what is already on the screen, like the rest of the frame.
+        repainted_rects: the screen areas painted again this frame, None if the whole screen
+        was. Only the texts and icons in those areas are drawn, since drawing anti-aliased text
+        again over itself would thicken it; they must include the rects from pop_dirty_rects().
+        """
+        for image, rect in self.get_items():
+            if repainted_rects is None or rect.collidelist(repainted_rects) != -1:
+                screen.blit(image, rect)
+
+
+    def get_items(self):
+        # (image, screen rect) of every text and icon, in the order they are drawn.
+        self.update_fields()
+        texts = [(self.field_surfaces[name], self.field_rects[name]) for name in HUD.textPositions]
+        icons = [(self.hp_image, self.icon_rects["hp"]), (self.timer_image, self.icon_rects["timer"]),
+                 (self.bullets_image, self.icon_rects["bullets"])]
+        return [(image, rect) for image, rect in texts + icons if image is not None]
+
+
+    def get_overlapped_rects(self, rects):
+        # The rects of the texts and icons that overlap rects; they have to be painted again whole.
+        return [rect.copy() for image, rect in self.get_items() if rect.collidelist(rects) != -1]
+    
+    
+    def update_fields(self):
+        self.render_field("hp", str(self.hp))   # HP at the top left
+        self.render_field("timer", self.format_time(self.timer))   # Timer at the top center
+        self.render_field("bullets", str(self.bullets))   # Bullets at the top right
+    
+    
+    def render_field(self, name, text):
+        # Renders a field's text again if it changed.
+        if text == self.field_texts[name]:
+            return
+        text_surface = self.text_surfaces.get(text)
+        if text_surface is None:
+            text_surface = self.text_surfaces[text] = self.font.render(text, True, WHITE)
+        old_rect = self.field_rects[name]
+        new_rect = text_surface.get_rect(topleft=HUD.textPositions[name])
+        self.field_texts[name] = text
+        self.field_surfaces[name] = text_surface
+        self.field_rects[name] = new_rect
+        self.dirty_rects.append(old_rect.union(new_rect))
+    
+    
+    def pop_dirty_rects(self):
+        # Updates the fields and returns the screen areas of the ones that changed since the last call.
+        self.update_fields()
+        dirty_rects = self.dirty_rects
+        self.dirty_rects = []
+        return dirty_rects
     
     
     def update_hud(self, new_hp, new_bullets, current_time):
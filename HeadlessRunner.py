@@ -0,0 +1,214 @@
+import os
+# The SDL drivers must be chosen before pygame is initialised (main.py calls pygame.init() on import).
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import random
+import time
+import pygame
+import main
+import AudioManager
+import GameClock
+import InputSource
+import PathFinder
+
+
+class ScriptedInput:
+
+    def __init__(self, steps, loop=True):
+        """
+        Drives the player from a script instead of the keyboard.
+        :param steps: List of (frames, held_keys, pressed_keys) tuples. held_keys are reported by
+                      get_pressed() for that many frames; pressed_keys send one KEYDOWN event each
+                      on the first frame of the step.
+        :param loop: Start again from the first step when the script runs out.
+        """
+        self.steps = steps
+        self.loop = loop
+        self.step_index = 0
+        self.step_frame = 0
+
+
+    @classmethod
+    def random_walk(cls, seed, step_frames=30, steps=200):
+        # A reproducible script: move in random directions and sometimes shoot.
+        rng = random.Random(seed)
+        moves = [pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d]
+        script = []
+        for i in range(steps):
+            held = {rng.choice(moves)}
+            if rng.random() < 0.3:
+                held.add(pygame.K_SPACE)
+            script.append((step_frames, held, ()))
+        return cls(script)
+
+
+    def current_step(self):
+        if self.step_index >= len(self.steps):
+            return (1, (), ())
+        return self.steps[self.step_index]
+
+
+    def get_pressed(self):
+        return InputSource.KeyState(self.current_step()[1])
+
+
+    def get_events(self):
+        """Returns the KEYDOWN events for the current frame."""
+        if self.step_frame != 0:
+            return []
+        events = []
+        for key in self.current_step()[2]:
+            name = pygame.key.name(key)
+            events.append(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=name if len(name) == 1 else ""))
+        return events
+
+
+    def advance(self):
+        # Move on by one frame.
+        self.step_frame += 1
+        if self.step_frame >= self.current_step()[0]:
+            self.step_frame = 0
+            self.step_index += 1
+            if self.loop and self.step_index >= len(self.steps):
+                self.step_index = 0
+
+
+class HeadlessRunner:
+
+    def __init__(self, level=1, dt=1 / 60, input_script=None, seed=None):
+        """
+        Runs the Game state without a window or a real-time clock: Game.update is
+        stepped with a fixed dt as fast as the CPU allows.
+        """
+        self.level = level
+        self.dt = dt
+        self.input_script = input_script if input_script is not None else ScriptedInput.random_walk(seed)
+
+        self.screen = pygame.display.set_mode((main.SCREEN_WIDTH, main.SCREEN_HEIGHT))
+        pygame.mixer.init()
+        self.audio_manager = AudioManager.AudioManager()
+        self.audio_manager.initialise()
+        self.game_info = {'game_active': False,
+                          'HP_default': 100,
+                          'Time_default': 180,
+                          'HP_scale': 1,
+                          'Time_scale': 1,
+                          'puzzle_seed': seed,
+                          'path_finders': dict(PathFinder.LEVEL_PATH_FINDERS),
+                          'next_level': 1,
+                          'dirty_rect_mode': True,
+        }
+        self.game = main.Game(self.game_info, self.audio_manager)
+        self.outcomes = []   # List of (frame, next state) every time the Game state finished
+
+
+    def start(self):
+        GameClock.clock.start_simulation()
+        InputSource.input_source.set_provider(self.input_script)
+        self.game.enter_state()
+        if self.level != 1:
+            # Jump straight to the requested level, the same way a retry reloads one.
+            self.game.current_level = self.level
+            self.game.level_reset = True
+            self.game.enter_state()
+
+
+    def step(self, frame):
+        """Simulates one frame of the Game state."""
+        GameClock.clock.advance(self.dt)
+        for event in self.input_script.get_events():
+            self.game.get_event(event)
+        self.game.update(self.screen, self.dt)
+        self.input_script.advance()
+
+        if self.game.done:
+            self.outcomes.append((frame, self.game.next))
+            self.game.done = False
+            self.game.cleanup()
+            if self.game.next == 'end_game':
+                return False
+            # Try again / next level / resume from pause: carry on as Control would.
+            self.game.enter_state()
+        return True
+
+
+    def run(self, frames):
+        """
+        Simulates up to the given number of frames and returns the timing results.
+        """
+        self.start()
+        start_time = time.perf_counter()
+        frames_run = 0
+        try:
+            for frame in range(frames):
+                frames_run += 1
+                if not self.step(frame):
+                    break
+        finally:
+            elapsed = time.perf_counter() - start_time
+            GameClock.clock.stop_simulation()
+            InputSource.input_source.reset()
+
+        return {
+            'frames': frames_run,
+            'seconds': elapsed,
+            'fps': frames_run / elapsed if elapsed > 0 else 0.0,
+            'simulated_seconds': frames_run * self.dt,
+            'outcomes': self.outcomes,
+        }
+
+
+def replay_headless(filename):
+    """
+    Replays a session recorded with `main.py --record` through the full Control
+    loop, without a window and as fast as the CPU allows.
+    """
+    app = main.create_app({
+        'size': (main.SCREEN_WIDTH, main.SCREEN_HEIGHT),
+        'fps': 60,
+        'title': "MazeGame",
+        'replay': filename,
+    })
+    start_time = time.perf_counter()
+    app.main_game_loop()
+    elapsed = time.perf_counter() - start_time
+    frames = app.input_replay.frames_played
+    GameClock.clock.stop_simulation()
+    InputSource.input_source.reset()
+    return {
+        'frames': frames,
+        'seconds': elapsed,
+        'fps': frames / elapsed if elapsed > 0 else 0.0,
+        'final_state': app.state_name,
+    }
+
+
+def run_headless():
+    parser = argparse.ArgumentParser(description="Run the game logic headless with a fixed time step.")
+    parser.add_argument("--frames", type=int, default=3600, help="Number of frames to simulate.")
+    parser.add_argument("--level", type=int, default=1, choices=[1, 2, 3], help="Level to start on.")
+    parser.add_argument("--dt", type=float, default=1 / 60, help="Fixed time step in seconds.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the scripted input and puzzles.")
+    parser.add_argument("--replay", help="Replay a session recorded with main.py --record instead.")
+    args = parser.parse_args()
+
+    if args.replay:
+        results = replay_headless(args.replay)
+        print(f"Replayed {results['frames']} frames in {results['seconds']:.2f} s: "
+              f"{results['fps']:.0f} frames per second (ended in state '{results['final_state']}')")
+        pygame.quit()
+        return
+
+    runner = HeadlessRunner(args.level, args.dt, seed=args.seed)
+    results = runner.run(args.frames)
+    print(f"Simulated {results['frames']} frames ({results['simulated_seconds']:.1f} s of game time) "
+          f"in {results['seconds']:.2f} s: {results['fps']:.0f} frames per second")
+    for frame, outcome in results['outcomes']:
+        print(f"  frame {frame}: -> {outcome}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    run_headless()
@@ -1,16 +1,17 @@
 class HealthSystem:
     
-    def __init__(self, max_health):
+    def __init__(self, max_health, audio_manager):
         self.max_health = max_health
         self.current_health = max_health
+        self.audio_manager = audio_manager   # Plays the sound of the player being damaged
 
-    def take_damage(self, amount, audio_manager):
+    def take_damage(self, amount):
         # Subtract the damage amount
         self.current_health -= amount
         if self.current_health < 0:
             self.current_health = 0
         # Play sound
-        audio_manager.playSoundEffect("player_damaged")
+        self.audio_manager.playSoundEffect("player_damaged")
 
     def heal(self, amount):
         if amount < 0:
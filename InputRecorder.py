@@ -0,0 +1,118 @@
+import struct
+import pygame
+import InputSource
+
+# File layout (little-endian):
+#   header: magic, format version, RNG seed, number of recorded keys, then each key code
+#   frame:  dt in microseconds, bitmask of the held recorded keys, number of events, then each event
+#   event:  event kind, key code, unicode code point (0 if none)
+MAGIC = b"MZRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHQB")
+KEY_CODE = struct.Struct("<i")
+FRAME = struct.Struct("<IBB")
+EVENT = struct.Struct("<BiI")
+EVENT_KEYDOWN = 0
+EVENT_QUIT = 1
+
+# The held keys the game reads every frame (Player movement and shooting).
+RECORDED_KEYS = [pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d, pygame.K_SPACE]
+
+
+def quantise_dt(dt):
+    # dt is stored in whole microseconds, so both the recording and the replay use this exact value.
+    return round(dt * 1000000) / 1000000
+
+
+class InputRecorder:
+
+    def __init__(self, filename, seed):
+        """
+        Records a play session to a compact binary log: per-frame dt, held keys,
+        KEYDOWN / QUIT events and the RNG seed used for the puzzles.
+        """
+        self.filename = filename
+        self.seed = seed
+        self.key_state = InputSource.KeyState(())   # Held keys of the current frame, as seen by the game
+        self.file = open(filename, "wb")
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, len(RECORDED_KEYS)))
+        for key in RECORDED_KEYS:
+            self.file.write(KEY_CODE.pack(key))
+
+
+    def get_pressed(self):
+        # The game reads the snapshot that was written to the log, not the live keyboard.
+        return self.key_state
+
+
+    def record_frame(self, dt, events):
+        """Takes the key snapshot for this frame and appends the frame to the log."""
+        pressed = pygame.key.get_pressed()
+        held = [key for key in RECORDED_KEYS if pressed[key]]
+        self.key_state = InputSource.KeyState(held)
+        mask = 0
+        for bit, key in enumerate(RECORDED_KEYS):
+            if key in self.key_state.held_keys:
+                mask |= 1 << bit
+
+        recorded_events = []
+        for event in events:
+            if event.type == pygame.KEYDOWN:
+                recorded_events.append(EVENT.pack(EVENT_KEYDOWN, event.key, ord(event.unicode) if len(event.unicode) == 1 else 0))
+            elif event.type == pygame.QUIT:
+                recorded_events.append(EVENT.pack(EVENT_QUIT, 0, 0))
+
+        self.file.write(FRAME.pack(round(dt * 1000000), mask, len(recorded_events)))
+        for data in recorded_events:
+            self.file.write(data)
+
+
+    def close(self):
+        self.file.close()
+
+
+class InputReplay:
+
+    def __init__(self, filename):
+        """
+        Plays back a log written by InputRecorder, frame by frame.
+        """
+        with open(filename, "rb") as file:
+            self.data = file.read()
+        magic, version, self.seed, key_count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"'{filename}' is not a recording this version of the game can replay")
+        offset = HEADER.size
+        self.keys = []
+        for i in range(key_count):
+            self.keys.append(KEY_CODE.unpack_from(self.data, offset)[0])
+            offset += KEY_CODE.size
+        self.offset = offset
+        self.key_state = InputSource.KeyState(())
+        self.frames_played = 0
+
+
+    def get_pressed(self):
+        return self.key_state
+
+
+    def next_frame(self):
+        """
+        Returns (dt, events) for the next frame, or None at the end of the recording.
+        """
+        if self.offset + FRAME.size > len(self.data):
+            return None
+        dt_microseconds, mask, event_count = FRAME.unpack_from(self.data, self.offset)
+        self.offset += FRAME.size
+        self.key_state = InputSource.KeyState([key for bit, key in enumerate(self.keys) if mask & (1 << bit)])
+
+        events = []
+        for i in range(event_count):
+            kind, key, code_point = EVENT.unpack_from(self.data, self.offset)
+            self.offset += EVENT.size
+            if kind == EVENT_KEYDOWN:
+                events.append(pygame.event.Event(pygame.KEYDOWN, key=key, unicode=chr(code_point) if code_point else ""))
+            elif kind == EVENT_QUIT:
+                events.append(pygame.event.Event(pygame.QUIT))
+        self.frames_played += 1
+        return dt_microseconds / 1000000, events
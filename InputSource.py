@@ -0,0 +1,40 @@
+import pygame
+
+class InputSource:
+
+    def __init__(self):
+        """
+        Where the game reads the held keys from. By default this is the keyboard;
+        a headless simulation or a replay installs its own provider instead.
+        """
+        self.provider = None   # Object with a get_pressed() method, or None for the keyboard
+
+
+    def get_pressed(self):
+        """Returns the key state, indexable by pygame key constants like pygame.key.get_pressed()."""
+        if self.provider is None:
+            return pygame.key.get_pressed()
+        return self.provider.get_pressed()
+
+
+    def set_provider(self, provider):
+        self.provider = provider
+
+
+    def reset(self):
+        # Go back to reading the real keyboard.
+        self.provider = None
+
+
+class KeyState:
+
+    def __init__(self, held_keys):
+        # A key state snapshot that behaves like the result of pygame.key.get_pressed().
+        self.held_keys = frozenset(held_keys)
+
+    def __getitem__(self, key):
+        return key in self.held_keys
+
+
+# The single input source shared by the whole process.
+input_source = InputSource()
@@ -0,0 +1,116 @@
+import os
+import io
+import sys
+import array
+import glob
+import argparse
+import xml.etree.ElementTree as ElementTree
+import pytmx
+import MapGrid
+import DistanceTable
+import CompiledLevel
+
+def get_compiled_filename(tmx_filename):
+    # Maps/Level_1.tmx -> Maps/Compiled/Level_1.lvl; MapRenderer looks for compiled levels here too
+    name = os.path.splitext(os.path.basename(tmx_filename))[0]
+    return os.path.join(os.path.dirname(tmx_filename), "Compiled", name + ".lvl")
+
+
+def pack_string(text):
+    data = text.encode("utf-8")
+    return CompiledLevel.STRING_LENGTH.pack(len(data)) + data
+
+
+def compile_level(tmx_filename, output_filename, navigation=True):
+    """
+    Compiles a TMX level into the binary format read by CompiledLevel.
+    :param navigation: Also store the all-pairs distance table of the level's walls.
+    Returns the number of bytes written.
+    """
+    # Without an image loader pytmx only records the (file, rect, flags) of each tile image.
+    tmx_data = pytmx.TiledMap(tmx_filename)
+    map_directory = os.path.dirname(tmx_filename)
+    tileset_files = [node.get("source") for node in ElementTree.parse(tmx_filename).getroot().findall("tileset")
+                     if node.get("source")]
+    sources = [os.path.basename(tmx_filename)] + tileset_files
+
+    out = io.BytesIO()
+    for source in sources:
+        out.write(pack_string(source))
+
+    tilesets = sorted(tmx_data.tilesets, key=lambda tileset: tileset.firstgid)
+    for tileset in tilesets:
+        out.write(CompiledLevel.TILESET.pack(tileset.firstgid))
+        out.write(pack_string(tileset.source or ""))
+        out.write(pack_string(getattr(tileset, "trans", None) or ""))
+
+    has_image = [False] * tmx_data.maxgid
+    for gid in range(tmx_data.maxgid):
+        image = tmx_data.images[gid] if gid < len(tmx_data.images) else None
+        if image is None or image[1] is None:
+            out.write(CompiledLevel.TILE.pack(CompiledLevel.NO_TILESET, 0, 0, 0, 0, 0, 0))
+            continue
+        filename, rect, flags = image
+        tileset = tmx_data.get_tileset_from_gid(gid)
+        out.write(CompiledLevel.TILE.pack(tilesets.index(tileset), tmx_data.tiledgidmap[gid],
+                                          CompiledLevel.pack_flags(flags), *rect))
+        has_image[gid] = True
+
+    walls = MapGrid.MapGrid(tmx_data.width, tmx_data.height)
+    tile_layers = [layer for layer in tmx_data.layers if isinstance(layer, pytmx.TiledTileLayer)]
+    for layer in tile_layers:
+        occupied_cells = [(x, y) for x, y, gid in layer.iter_data() if has_image[gid]]
+        out.write(pack_string(layer.name))
+        out.write(CompiledLevel.LAYER.pack(bool(layer.visible), len(occupied_cells)))
+        for cell in occupied_cells:
+            out.write(CompiledLevel.CELL.pack(*cell))
+        if (CompiledLevel.HEADER.size + out.tell()) % 2:
+            out.write(b"\0")
+        gids = array.array("H", [gid for row in layer.data for gid in row])
+        if sys.byteorder == "big":
+            gids.byteswap()   # The file is always little-endian
+        out.write(gids.tobytes())
+        # The same rule as MapRenderer.get_map_grid(): visible Walls tiles block movement
+        if layer.visible and layer.name == "Walls":
+            for x, y in occupied_cells:
+                walls.cells[y * walls.width + x] = 1
+
+    wall_bits = bytearray((walls.width * walls.height + 7) // 8)
+    for index, cell in enumerate(walls.cells):
+        if cell:
+            wall_bits[index >> 3] |= 1 << (index & 7)
+    out.write(wall_bits)
+
+    navigation_size = 0
+    if navigation:
+        table = DistanceTable.DistanceTable()
+        table.build(walls)
+        start = out.tell()
+        table.write(out)
+        navigation_size = out.tell() - start
+
+    header = CompiledLevel.HEADER.pack(
+        CompiledLevel.MAGIC, CompiledLevel.VERSION, tmx_data.width, tmx_data.height,
+        tmx_data.tilewidth, tmx_data.tileheight, len(tilesets), tmx_data.maxgid, len(tile_layers),
+        len(sources), CompiledLevel.get_source_hash(map_directory, sources), navigation_size)
+    os.makedirs(os.path.dirname(output_filename) or ".", exist_ok=True)
+    with open(output_filename, "wb") as file:
+        file.write(header)
+        file.write(out.getvalue())
+    return len(header) + out.tell()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile TMX levels into the binary level format.")
+    parser.add_argument("maps", nargs="*", help="TMX files to compile (default: every Maps/Level_*.tmx).")
+    parser.add_argument("--no-navigation", action="store_true", help="Leave the distance table out.")
+    args = parser.parse_args()
+
+    for tmx_filename in args.maps or sorted(glob.glob(os.path.join("Maps", "Level_*.tmx"))):
+        output_filename = get_compiled_filename(tmx_filename)
+        size = compile_level(tmx_filename, output_filename, navigation=not args.no_navigation)
+        print(f"{tmx_filename} -> {output_filename} ({size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
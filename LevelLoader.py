@@ -0,0 +1,189 @@
+import os
+import threading
+import time
+import MapRenderer
+import CollisionManager
+import PathFinder
+import AssetCache
+import Enemy
+
+
+class LoadedLevel:
+
+    def __init__(self, level, path_finder_name):
+        """
+        Everything Game needs to start a level: the parsed and baked map, the
+        collision indices and the prepared pathfinder.
+        """
+        self.level = level
+        self.path_finder_name = path_finder_name
+        self.map_renderer = None
+        self.collision_manager = None
+        self.path_finder = None
+        self.load_seconds = 0.0   # How long building the level took
+        self.map_mtime = None     # Modification time of the TMX file it was built from
+        self.decoded_images = {}  # Asset cache key -> enemy animation frame decoded but not converted yet
+
+
+    def finish(self):
+        """
+        Converts the level's tiles and enemy frames to the display format and bakes the
+        background. Needs the display, so it runs on the main thread after load_level().
+        """
+        self.map_renderer.convert_tiles()
+        self.map_renderer.bake_background()
+        for key, image in self.decoded_images.items():
+            AssetCache.asset_cache.add_image(key, image)
+        self.decoded_images = {}
+
+
+def get_map_mtime(level):
+    # Returns None when the map file does not exist.
+    try:
+        return os.path.getmtime(MapRenderer.MapRenderer.get_map_filename(level))
+    except OSError:
+        return None
+
+
+def load_level(level, path_finder_name):
+    """
+    Parses, scales and indexes a level. Safe to run outside the main thread: images are
+    only decoded here, and LoadedLevel.finish() converts them on the main thread.
+    """
+    started = time.perf_counter()
+    loaded = LoadedLevel(level, path_finder_name)
+    loaded.map_mtime = get_map_mtime(level)
+    loaded.map_renderer = MapRenderer.MapRenderer()
+    loaded.map_renderer.load_map_data(str(level))
+    loaded.map_renderer.scale_all_tiles()
+    loaded.collision_manager = CollisionManager.CollisionManager(32, 32)
+    loaded.collision_manager.initialise(loaded.map_renderer)
+    loaded.path_finder = PathFinder.create_path_finder(path_finder_name)
+    loaded.path_finder.prepare(loaded.collision_manager.map_grid, loaded.map_renderer.get_navigation_data())
+    # Decode the enemy animation frames now, so spawning the enemies only hits the cache
+    loaded.decoded_images = AssetCache.asset_cache.decode_images(
+        [(path, "alpha", None) for animation_paths in Enemy.Enemy.animationPaths.values()
+         for paths in animation_paths.values() for path in paths])
+    loaded.load_seconds = time.perf_counter() - started
+    return loaded
+
+
+class LevelLoader:
+
+    def __init__(self):
+        """
+        Prepares the next level in a worker thread while a screen such as
+        Inter_level or Try_again waits for the player to press Enter.
+        """
+        self.thread = None
+        self.level = None
+        self.path_finder_name = None
+        self.result = None
+        self.error = None
+
+
+    def start(self, level, path_finder_name):
+        """Starts loading level in the background, unless it is already resident or being loaded."""
+        if level_cache.get(level, path_finder_name) is not None:
+            return
+        if self.thread is not None and (self.level, self.path_finder_name) == (level, path_finder_name):
+            return
+        self.wait()
+        self.level = level
+        self.path_finder_name = path_finder_name
+        self.result = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, name=f"LevelLoader-{level}", daemon=True)
+        self.thread.start()
+
+
+    def run(self):
+        try:
+            self.result = load_level(self.level, self.path_finder_name)
+        except BaseException as e:
+            # load_map_data raises SystemExit on a missing map; leave that to the main thread.
+            self.error = e
+
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+
+
+    def take(self, level, path_finder_name):
+        """
+        Returns the preloaded level (waiting for the worker if it is still busy) once
+        its images are converted on this thread, or None if a different level was
+        preloaded or the preload failed. The loader is empty afterwards.
+        """
+        if self.thread is None or (self.level, self.path_finder_name) != (level, path_finder_name):
+            return None
+        started = time.perf_counter()
+        self.wait()
+        waited = time.perf_counter() - started
+        result, error = self.result, self.error
+        self.thread = None
+        self.level = None
+        self.path_finder_name = None
+        self.result = None
+        self.error = None
+        if error is not None:
+            print(f"Error preloading level {level}: {error}")
+            return None
+        started = time.perf_counter()
+        result.finish()
+        finished = time.perf_counter() - started
+        print(f"LevelLoader: level {level} took {result.load_seconds * 1000:.1f} ms to load, "
+              f"waited {waited * 1000:.1f} ms for it ({(result.load_seconds - waited) * 1000:.1f} ms saved), "
+              f"{finished * 1000:.1f} ms to convert it")
+        return result
+
+
+class LevelCache:
+
+    def __init__(self):
+        """
+        Keeps loaded levels resident, so resuming from the pause menu or retrying
+        a level does not parse the TMX file again. An entry is only used while the
+        map file's modification time and the pathfinder still match; levels
+        that are finished must be dropped with evict().
+        """
+        self.levels = {}   # Level number -> LoadedLevel
+
+
+    def get(self, level, path_finder_name):
+        loaded = self.levels.get(level)
+        if loaded is None:
+            return None
+        if loaded.path_finder_name != path_finder_name or loaded.map_mtime != get_map_mtime(level):
+            # The map was edited or a different pathfinder was chosen: rebuild it.
+            del self.levels[level]
+            return None
+        return loaded
+
+
+    def put(self, loaded):
+        self.levels[loaded.level] = loaded
+        self.trim_tiles()
+
+
+    def evict(self, level=None):
+        """Drops the given level, or every level if none is given."""
+        if level is None:
+            self.levels = {}
+        else:
+            self.levels.pop(level, None)
+        self.trim_tiles()
+
+
+    def trim_tiles(self):
+        # The shared scaled tile cache only keeps the tiles of the resident levels.
+        tiles = {}
+        for loaded in self.levels.values():
+            tiles.update(loaded.map_renderer.level_tiles)
+        MapRenderer.scaled_tile_cache.retain(tiles)
+
+
+# The single loader and level cache shared by the whole process.
+level_loader = LevelLoader()
+level_cache = LevelCache()
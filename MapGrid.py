@@ -0,0 +1,45 @@
+class MapGrid:
+
+    def __init__(self, width, height, cells=None):
+        """
+        Walkability grid of a level stored as one contiguous bytearray.
+        cells[y * width + x] is 0 for a walkable tile and 1 for a wall.
+        """
+        self.width = width
+        self.height = height
+        self.cells = cells if cells is not None else bytearray(width * height)
+        if len(self.cells) != width * height:
+            raise ValueError(f"Expected {width * height} cells for a {width}x{height} grid, got {len(self.cells)}")
+
+
+    @classmethod
+    def from_rows(cls, rows):
+        # Builds a grid from a list of rows (the old nested-list layout).
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        cells = bytearray()
+        for row in rows:
+            cells.extend(row)
+        return cls(width, height, cells)
+
+
+    def __len__(self):
+        return self.height
+
+
+    def __getitem__(self, y):
+        # grid[y][x] still works: each row is a view into the cells, not a copy.
+        if not 0 <= y < self.height:
+            raise IndexError("grid row out of range")
+        return memoryview(self.cells)[y * self.width:(y + 1) * self.width]
+
+
+    def is_walkable(self, x, y):
+        return 0 <= x < self.width and 0 <= y < self.height and self.cells[y * self.width + x] == 0
+
+
+def as_map_grid(grid):
+    """Returns grid unchanged if it is a MapGrid, otherwise converts a list of rows into one."""
+    if isinstance(grid, MapGrid):
+        return grid
+    return MapGrid.from_rows(grid)
@@ -1,6 +1,77 @@
 import os
+import threading
 import pygame
 import pytmx
+from pytmx.util_pygame import handle_transformation, smart_convert
+import MapGrid
+import CompiledLevel
+import LevelCompiler
+
+class ScaledTileCache:
+
+    def __init__(self):
+        """
+        Scaled tile images shared by every level. Tiles are keyed by tileset image,
+        local tile id and flip flags, so levels that use the same tilesets (Forest
+        and Dungeon1 are in all three) scale each tile only once.
+        """
+        self.tiles = {}    # (tileset image, local id, flags, scale) -> scaled Surface
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()   # Levels are also loaded from a worker thread
+
+
+    def get_tile(self, key):
+        # Returns the scaled and converted tile stored under key, or None.
+        with self.lock:
+            scaled_img = self.tiles.get(key)
+            if scaled_img is not None:
+                self.hits += 1
+            return scaled_img
+
+
+    def add_tile(self, key, scaled_img):
+        # Stores a scaled and converted tile, or returns the one stored under key meanwhile.
+        with self.lock:
+            self.misses += 1
+            return self.tiles.setdefault(key, scaled_img)
+
+
+    def retain(self, tiles):
+        # Keeps only the given key -> scaled tile entries (the tiles of the resident levels) and drops the rest.
+        with self.lock:
+            self.tiles = dict(tiles)
+
+
+    def get_stats(self):
+        surface_bytes = sum(tile.get_pitch() * tile.get_height() for tile in self.tiles.values())
+        return {"tiles": len(self.tiles), "hits": self.hits, "misses": self.misses, "surface_bytes": surface_bytes}
+
+
+    def clear(self):
+        with self.lock:
+            self.tiles = {}
+            self.hits = 0
+            self.misses = 0
+
+
+def decoding_image_loader(filename, colorkey, **kwargs):
+    """
+    pytmx image loader that cuts the tiles out of their tileset image like
+    pytmx.util_pygame.pygame_image_loader, but leaves them in the file's format:
+    converting needs the display, and levels are also loaded from a worker thread.
+    MapRenderer.convert_tiles() converts them on the main thread.
+    """
+    image = pygame.image.load(filename)
+
+    def load_image(rect=None, flags=None):
+        tile = image.subsurface(rect) if rect else image.copy()
+        if flags:
+            tile = handle_transformation(tile, flags)
+        return tile
+
+    return load_image
+
 
 class MapRenderer:
     
@@ -11,6 +82,16 @@ class MapRenderer:
         self.tmx_data = None
         # Will store scaled versions of each tile image keyed by GID
         self.scaled_tiles = {}
+        # All static layers composited once per level into a single surface
+        self.background = None
+        # Screen areas of rebaked tiles that have not been drawn to the screen yet
+        self.changed_rects = []
+        # (layer name, x, y, gid) of every tile removed by clear_tile(), so they can be put back
+        self.cleared_tiles = []
+        # scaled_tile_cache key -> scaled Surface of every tile this level uses
+        self.level_tiles = {}
+        # (gid, key, colour key) of the scaled tiles still in the file's format
+        self.unconverted_tiles = []
 
 
     def load_map_data(self, level):
@@ -19,15 +100,24 @@ class MapRenderer:
         self.filename = None   # Reset the filename in case it was set previously.
         self.tmx_data = None   # Reset the TMX data in case it was set previously.
         self.scaled_tiles = {} # Reset the scaled tiles in case they were set previously.
+        self.background = None # Reset the prebaked background in case it was set previously.
+        self.changed_rects = []
+        self.cleared_tiles = []
+        self.level_tiles = {}
+        self.unconverted_tiles = []
         self.width = 0
         self.height = 0
-        self.filename = self.filename = f"Maps/Level_{level}.tmx"   # Path to the TMX file.
+        self.filename = self.filename = self.get_map_filename(level)   # Path to the TMX file.
         if not os.path.exists(self.filename):
             print(f"Error: TMX file '{self.filename}' not found.")
             pygame.quit()
             raise SystemExit
         try:
-            self.tmx_data = pytmx.load_pygame(self.filename, pixelalpha=True)
+            # Use the compiled level if it is up to date; otherwise parse the TMX file.
+            self.tmx_data = CompiledLevel.load_compiled_level(self.get_compiled_filename(level),
+                                                              os.path.dirname(self.filename))
+            if self.tmx_data is None:
+                self.tmx_data = pytmx.TiledMap(self.filename, image_loader=decoding_image_loader, pixelalpha=True)
             self.width = self.tmx_data.width * self.tmx_data.tilewidth * self.scale
             self.height = self.tmx_data.height * self.tmx_data.tileheight * self.scale
         except Exception as e:
@@ -36,30 +126,91 @@ class MapRenderer:
             raise SystemExit
         
         
+    @staticmethod
+    def get_map_filename(level):
+        return f"Maps/Level_{level}.tmx"
+
+
+    @staticmethod
+    def get_compiled_filename(level):
+        # Written by LevelCompiler.py
+        return LevelCompiler.get_compiled_filename(MapRenderer.get_map_filename(level))
+
+
     def get_tmx_data(self):
         return self.tmx_data
 
 
+    def get_used_gids(self):
+        # Every GID placed in a tile layer of this level (0 is an empty cell).
+        used_gids = set()
+        for layer in self.tmx_data.visible_layers:
+            if hasattr(layer, 'data'):
+                for row in layer.data:
+                    used_gids.update(row)
+        used_gids.discard(0)
+        return used_gids
+
+
     def scale_all_tiles(self):
         """
-        Creates scaled versions of each tile image and stores them in self.scaled_tiles.
-        Iterates through all possible GIDs in the TMX data.
+        Creates scaled versions of the tile images used by the level's layers and
+        stores them in self.scaled_tiles. The scaled images come from the shared
+        scaled_tile_cache, so a tile already scaled for another level is reused.
+        Tiles that are not in the cache are scaled in the file's format, which is safe
+        off the main thread; convert_tiles() must be called before the level is drawn.
         """
-        max_gid = self.tmx_data.maxgid
-        for gid in range(max_gid):
+        # pytmx numbers the tiles of each map itself; map them back to the tileset and flags
+        tile_flags = {}
+        for pairs in self.tmx_data.gidmap.values():
+            for gid, flags in pairs:
+                tile_flags[gid] = tuple(flags)
+
+        for gid in sorted(self.get_used_gids()):
             tile_img = self.tmx_data.get_tile_image_by_gid(gid)
             if tile_img:
-                # Scale the tile image
-                w, h = tile_img.get_width(), tile_img.get_height()
-                scaled_img = pygame.transform.scale(tile_img, (w * self.scale, h * self.scale))
-                self.scaled_tiles[gid] = scaled_img
+                tiled_gid = self.tmx_data.tiledgidmap[gid]
+                tileset = self.tmx_data.get_tileset_from_gid(gid)
+                if tileset.source:
+                    tileset_key = os.path.normpath(tileset.source)
+                else:
+                    # A tileset of separate images has no source; only share it within this map
+                    tileset_key = (self.filename, tileset.firstgid)
+                key = (tileset_key, tiled_gid - tileset.firstgid, tile_flags.get(gid), self.scale)
+                scaled_img = scaled_tile_cache.get_tile(key)
+                if scaled_img is None:
+                    w, h = tile_img.get_width(), tile_img.get_height()
+                    scaled_img = pygame.transform.scale(tile_img, (w * self.scale, h * self.scale))
+                    trans = getattr(tileset, 'trans', None)
+                    self.unconverted_tiles.append((gid, key, pygame.Color(f"#{trans}") if trans else None))
+                self.scaled_tiles[gid] = self.level_tiles[key] = scaled_img
+
+
+    def convert_tiles(self):
+        """
+        Converts the tiles scaled by scale_all_tiles() to the display format the way
+        pytmx.load_pygame(pixelalpha=True) does, and adds them to the shared cache.
+        Needs the display, so it runs on the main thread.
+        """
+        for gid, key, colorkey in self.unconverted_tiles:
+            tile = smart_convert(self.scaled_tiles[gid], colorkey, True)
+            self.scaled_tiles[gid] = self.level_tiles[key] = scaled_tile_cache.add_tile(key, tile)
+        self.unconverted_tiles = []
                 
+    def get_navigation_data(self):
+        # Distance table stored in a compiled level, None when the level came from the TMX file.
+        return getattr(self.tmx_data, 'navigation_data', None)
+
+
     def get_scaled_tiles(self):
         return self.scaled_tiles
 
 
     def get_map_grid(self):
-        map = [[0 for i in range(40)] for j in range(21)]
+        # Walkability grid sized from the TMX map: 1 for wall tiles, 0 for walkable ones.
+        if isinstance(self.tmx_data, CompiledLevel.CompiledLevel):
+            return self.tmx_data.get_map_grid()
+        map = MapGrid.MapGrid(self.tmx_data.width, self.tmx_data.height)
         for layer in self.tmx_data.visible_layers:
             # Check if this is a tile layer and if its name matches the one we need.
             if hasattr(layer, 'data') and layer.name == "Walls":
@@ -67,24 +218,107 @@ class MapRenderer:
                     # Get the tile image (if available). We only need the rect.
                     tile = self.scaled_tiles.get(gid)
                     if tile:
-                        map[y][x] = 1
+                        map.cells[y * map.width + x] = 1
         return map
 
 
-    def draw(self, screen):
+    def bake_background(self):
         """
-        Draws the map by looking up each tile's scaled
-        image and blitting it at scaled positions.
+        Composites every visible tile layer once into a single map-sized surface,
+        so drawing the map is one blit per frame. Call after convert_tiles().
         """
         tilewidth = self.tmx_data.tilewidth * self.scale
         tileheight = self.tmx_data.tileheight * self.scale
 
+        self.background = pygame.Surface((self.width, self.height))
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        self.background.fill((0, 0, 0))
+
         for layer in self.tmx_data.visible_layers:
             # Only tile layers have 'data'; object layers do not.
             if hasattr(layer, 'data'):
                 for x, y, gid in layer:
                     tile = self.scaled_tiles.get(gid)
                     if tile:
-                        # size of the maze map needed (as rectangle): [0, 48, 1280, 672]
-                        # Multiply tile coordinates by the scale-adjusted width/height, and add 48 to y to account for space for HUD.
-                        screen.blit(tile, (x * tilewidth, y * tileheight + 48))
\ No newline at end of file
+                        # Multiply tile coordinates by the scale-adjusted width/height.
+                        self.background.blit(tile, (x * tilewidth, y * tileheight))
+
+
+    def rebake_tiles(self, cells):
+        """
+        Re-composites only the given (x, y) cells of the background from the
+        current layer data, e.g. after a tile was removed from a layer.
+        """
+        if self.background is None:
+            self.bake_background()
+            return
+        tilewidth = self.tmx_data.tilewidth * self.scale
+        tileheight = self.tmx_data.tileheight * self.scale
+
+        for x, y in cells:
+            cell_rect = pygame.Rect(x * tilewidth, y * tileheight, tilewidth, tileheight)
+            self.background.fill((0, 0, 0), cell_rect)
+            for layer in self.tmx_data.visible_layers:
+                if hasattr(layer, 'data'):
+                    tile = self.scaled_tiles.get(layer.data[y][x])
+                    if tile:
+                        self.background.blit(tile, cell_rect.topleft)
+            self.changed_rects.append(cell_rect.move(0, 48))
+
+
+    def clear_tile(self, layer_name, x, y):
+        # Removes a single tile from a layer (e.g. a collected power-up) and redraws only that cell.
+        for layer in self.tmx_data.visible_layers:
+            if hasattr(layer, 'data') and layer.name == layer_name and layer.data[y][x]:
+                self.cleared_tiles.append((layer_name, x, y, layer.data[y][x]))
+                layer.data[y][x] = 0
+        self.rebake_tiles([(x, y)])
+
+
+    def restore_tiles(self):
+        # Puts back every tile removed by clear_tile(), e.g. when a resident level is played again.
+        if not self.cleared_tiles:
+            return
+        for layer_name, x, y, gid in self.cleared_tiles:
+            for layer in self.tmx_data.visible_layers:
+                if hasattr(layer, 'data') and layer.name == layer_name:
+                    layer.data[y][x] = gid
+        cells = [(x, y) for layer_name, x, y, gid in self.cleared_tiles]
+        self.cleared_tiles = []
+        self.rebake_tiles(cells)
+
+
+    def draw(self, screen):
+        """
+        Draws the map by blitting the prebaked background.
+        """
+        if self.background is None:
+            self.bake_background()
+        # size of the maze map needed (as rectangle): [0, 48, 1280, 672]
+        # Add 48 to y to account for space for HUD.
+        screen.blit(self.background, (0, 48))
+        self.changed_rects = []
+
+
+    def draw_area(self, screen, rect):
+        """
+        Draws only the part of the map under rect (in screen coordinates),
+        to paint over what was drawn there last frame.
+        """
+        if self.background is None:
+            self.bake_background()
+        # The HUD band above the map is left black, as draw() leaves it
+        if rect.top < 48:
+            screen.fill((0, 0, 0), (rect.left, rect.top, rect.width, min(rect.bottom, 48) - rect.top))
+        screen.blit(self.background, rect.topleft, rect.move(0, -48))
+
+
+    def pop_changed_rects(self):
+        # Screen areas changed by rebake_tiles() since the map was last drawn.
+        changed_rects, self.changed_rects = self.changed_rects, []
+        return changed_rects
+
+
+# The single scaled tile cache shared by every level.
+scaled_tile_cache = ScaledTileCache()
\ No newline at end of file
@@ -0,0 +1,100 @@
+from abc import ABC, abstractmethod
+import AStar_PathFinder
+import Dijkstra_PathFinder
+import FlowField
+import DistanceTable
+
+# Pathfinding engine used by the enemies on each level. Change these based on
+# the results of PathFinder_Benchmark.py. "distance_table" precomputes every path
+# when the level loads (cached in Maps/NavCache), so queries are a single lookup.
+LEVEL_PATH_FINDERS = {1: "flow_field", 2: "flow_field", 3: "flow_field"}
+
+
+class PathFinder(ABC):
+
+    def prepare(self, grid, navigation_data=None):
+        """
+        Called once when a level is loaded, before any query on its grid.
+        navigation_data: distance table stored in the compiled level, if it has one.
+        """
+        pass
+
+
+    @abstractmethod
+    def get_next_step(self, grid, start, goal):
+        """
+        Returns the next tile (x, y) to move to from start towards goal,
+        or None if start is the goal or the goal cannot be reached.
+        Every engine must override it; an engine without it cannot be created.
+        """
+
+
+class DijkstraPathFinder(PathFinder):
+
+    def get_next_step(self, grid, start, goal):
+        # dijkstra() leaves the start tile out of the path.
+        path = Dijkstra_PathFinder.dijkstra(grid, start, goal)
+        return path[0] if path else None
+
+
+class AStarPathFinder(PathFinder):
+
+    def get_next_step(self, grid, start, goal):
+        # a_star() includes the start tile in the path.
+        path = AStar_PathFinder.a_star(grid, start, goal)
+        return path[1] if path and len(path) > 1 else None
+
+
+class FlowFieldPathFinder(PathFinder):
+
+    def __init__(self):
+        # One distance field towards the goal, shared by every query.
+        self.flow_field = FlowField.FlowField()
+
+
+    def get_next_step(self, grid, start, goal):
+        return self.flow_field.get_next_step(grid, start, goal)
+
+
+class DistanceTablePathFinder(PathFinder):
+
+    def __init__(self):
+        self.grid = None
+        self.table = DistanceTable.DistanceTable()
+
+
+    def prepare(self, grid, navigation_data=None):
+        # Use the table compiled into the level, or load (or build and cache) one for this grid.
+        self.grid = grid
+        if navigation_data is not None:
+            try:
+                self.table.load_buffer(navigation_data)
+                if (self.table.width, self.table.height) == (grid.width, grid.height):
+                    return
+                print("Error: Compiled distance table does not match the level, rebuilding it.")
+            except ValueError as e:
+                print(f"Error loading compiled distance table: {e}")
+        self.table.prepare(grid)
+
+
+    def get_next_step(self, grid, start, goal):
+        if grid is not self.grid:
+            self.prepare(grid)
+        return self.table.get_next_step(start, goal)
+
+
+PATH_FINDERS = {
+    "dijkstra": DijkstraPathFinder,
+    "a_star": AStarPathFinder,
+    "flow_field": FlowFieldPathFinder,
+    "distance_table": DistanceTablePathFinder,
+}
+
+
+def create_path_finder(name):
+    """Creates the pathfinding engine with the given name (see PATH_FINDERS)."""
+    path_finder_class = PATH_FINDERS.get(name)
+    if path_finder_class is None:
+        print(f"Error: Unknown pathfinder '{name}', using the flow field instead.")
+        path_finder_class = FlowFieldPathFinder
+    return path_finder_class()
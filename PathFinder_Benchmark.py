@@ -0,0 +1,202 @@
+import argparse
+import json
+import random
+import time
+from collections import deque
+import tempfile
+import DistanceTable
+import MapGrid
+import PathFinder
+
+# Maze sizes (width, height) from the size of a level up to 1000x1000.
+DEFAULT_SIZES = [(40, 21), (101, 101), (251, 251), (501, 501), (1000, 1000)]
+
+# The distance table holds two entries per pair of walkable cells, so it is only built for small mazes.
+TABLE_CELL_LIMIT = 3000
+
+
+def generate_maze(width, height, rng, braid=0.0):
+    """
+    Generates a maze as a MapGrid (1 = wall, 0 = walkable) with a border of walls.
+    Rooms sit on odd coordinates and are carved with an iterative depth-first search,
+    which gives a perfect maze (exactly one path between any two rooms).
+    :param braid: Fraction of dead ends to open up, which adds loops to the maze.
+    """
+    grid = [[1] * width for y in range(height)]
+    # Rooms need odd coordinates that are not on the border.
+    last_x = width - 2 if width % 2 == 1 else width - 3
+    last_y = height - 2 if height % 2 == 1 else height - 3
+
+    stack = [(1, 1)]
+    grid[1][1] = 0
+    while stack:
+        x, y = stack[-1]
+        options = []
+        for dx, dy in [(-2, 0), (2, 0), (0, -2), (0, 2)]:
+            nx, ny = x + dx, y + dy
+            if 1 <= nx <= last_x and 1 <= ny <= last_y and grid[ny][nx] == 1:
+                options.append((nx, ny, dx, dy))
+        if options:
+            nx, ny, dx, dy = rng.choice(options)
+            grid[y + dy // 2][x + dx // 2] = 0
+            grid[ny][nx] = 0
+            stack.append((nx, ny))
+        else:
+            stack.pop()
+
+    if braid > 0:
+        for y in range(1, last_y + 1, 2):
+            for x in range(1, last_x + 1, 2):
+                walls = [(dx, dy) for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)] if grid[y + dy][x + dx] == 1]
+                # A dead end has three walls around it; knock one of the inner ones down.
+                if len(walls) == 3 and rng.random() < braid:
+                    inner = [(dx, dy) for dx, dy in walls
+                             if 1 <= x + 2 * dx <= last_x and 1 <= y + 2 * dy <= last_y]
+                    if inner:
+                        dx, dy = rng.choice(inner)
+                        grid[y + dy][x + dx] = 0
+    return MapGrid.MapGrid.from_rows(grid)
+
+
+def bfs_distances(grid, goal):
+    # Reference shortest distances from every reachable cell to goal.
+    distances = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        x, y = queue.popleft()
+        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+            nx, ny = x + dx, y + dy
+            if grid.is_walkable(nx, ny) and (nx, ny) not in distances:
+                distances[(nx, ny)] = distances[(x, y)] + 1
+                queue.append((nx, ny))
+    return distances
+
+
+def is_optimal_step(step, start, distances):
+    """
+    Checks a next step against the reference distances to the goal: it must be a walkable
+    neighbour one step closer to the goal, or None if start is the goal or cannot reach it.
+    """
+    expected = distances.get(start)
+    if not expected:
+        return step is None
+    if step is None or abs(step[0] - start[0]) + abs(step[1] - start[1]) != 1:
+        return False
+    return distances.get(step) == expected - 1
+
+
+def run_benchmark(sizes, queries_per_maze, seed, time_budget, path_finders=None, starts_per_goal=5,
+                  table_cell_limit=TABLE_CELL_LIMIT):
+    """
+    Times every pathfinding engine (PathFinder.PATH_FINDERS) through the same prepare() /
+    get_next_step() interface the enemies use, on random queries in perfect and braided
+    mazes of each size, and checks that every step returned is on a shortest path.
+    Queries come in groups sharing a goal, like the enemies chasing the player.
+    :param time_budget: Seconds an engine may spend on one maze's queries before the rest are skipped.
+    :param table_cell_limit: Mazes with more walkable cells than this are skipped for the
+                             distance table, whose size grows with the square of the cell count.
+    """
+    path_finders = path_finders or list(PathFinder.PATH_FINDERS)
+    rng = random.Random(seed)
+    results = []
+    for width, height in sizes:
+        for maze_type, braid in [("perfect", 0.0), ("braided", 0.5)]:
+            grid = generate_maze(width, height, rng, braid)
+            open_cells = [(x, y) for y in range(height) for x in range(width) if grid.is_walkable(x, y)]
+            queries = []
+            for i in range(queries_per_maze):
+                if i % starts_per_goal == 0:
+                    goal = rng.choice(open_cells)
+                    distances = bfs_distances(grid, goal)
+                queries.append((rng.choice(open_cells), goal, distances))
+
+            for name in path_finders:
+                result = {
+                    "path_finder": name,
+                    "maze": maze_type,
+                    "width": width,
+                    "height": height,
+                    "open_cells": len(open_cells),
+                }
+                if name == "distance_table" and len(open_cells) > table_cell_limit:
+                    result["skipped"] = len(queries)
+                    result["reason"] = f"more than {table_cell_limit} walkable cells"
+                    results.append(result)
+                    print(f"{name:>14} {maze_type:>8} {width}x{height}: skipped ({result['reason']})")
+                    continue
+
+                # prepare() runs once per level load: the first call builds whatever the engine
+                # precomputes, the second one (a new engine on the same grid) can use the NavCache.
+                began = time.perf_counter()
+                engine = PathFinder.create_path_finder(name)
+                engine.prepare(grid)
+                prepare_seconds = time.perf_counter() - began
+                began = time.perf_counter()
+                engine = PathFinder.create_path_finder(name)
+                engine.prepare(grid)
+                cached_prepare_seconds = time.perf_counter() - began
+
+                times = []
+                optimal = 0
+                wrong = []
+                for start, goal, distances in queries:
+                    if sum(times) > time_budget:
+                        break
+                    began = time.perf_counter()
+                    step = engine.get_next_step(grid, start, goal)
+                    times.append(time.perf_counter() - began)
+                    if is_optimal_step(step, start, distances):
+                        optimal += 1
+                    else:
+                        wrong.append({"start": start, "goal": goal, "expected": distances.get(start), "step": step})
+
+                ordered = sorted(times)
+                result.update({
+                    "prepare_ms": prepare_seconds * 1000,
+                    "cached_prepare_ms": cached_prepare_seconds * 1000,
+                    "queries": len(times),
+                    "skipped": len(queries) - len(times),
+                    "optimal": optimal,
+                    "mean_ms": sum(times) / len(times) * 1000 if times else None,
+                    "median_ms": ordered[len(ordered) // 2] * 1000 if times else None,
+                    "max_ms": ordered[-1] * 1000 if times else None,
+                    "wrong": wrong[:10],
+                })
+                results.append(result)
+                print(f"{name:>14} {maze_type:>8} {width}x{height}: prepare {result['prepare_ms']:.1f} ms "
+                      f"(cached {result['cached_prepare_ms']:.1f} ms), {result['queries']} queries, "
+                      f"{optimal} optimal, mean {result['mean_ms'] or 0:.3f} ms"
+                      + (f", {result['skipped']} skipped (over the time budget)" if result['skipped'] else ""))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pathfinders on generated mazes.")
+    parser.add_argument("--sizes", nargs="*", default=[f"{w}x{h}" for w, h in DEFAULT_SIZES],
+                        help="Maze sizes as WIDTHxHEIGHT.")
+    parser.add_argument("--pairs", type=int, default=20, help="Start/goal queries per maze.")
+    parser.add_argument("--starts-per-goal", type=int, default=5,
+                        help="Queries sharing each goal, like enemies chasing the player.")
+    parser.add_argument("--path-finders", nargs="*", default=list(PathFinder.PATH_FINDERS),
+                        help="Engines to benchmark (names from PathFinder.PATH_FINDERS).")
+    parser.add_argument("--table-cell-limit", type=int, default=TABLE_CELL_LIMIT,
+                        help="Largest number of walkable cells to build a distance table for.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the mazes and the pairs.")
+    parser.add_argument("--time-budget", type=float, default=30.0,
+                        help="Seconds each pathfinder may spend per maze.")
+    parser.add_argument("--output", default="pathfinder_benchmark.json", help="File to write the JSON results to.")
+    args = parser.parse_args()
+
+    sizes = [tuple(int(value) for value in size.lower().split("x")) for size in args.sizes]
+    # Distance tables of the generated mazes go to a throwaway NavCache, not the game's.
+    with tempfile.TemporaryDirectory() as cache_directory:
+        DistanceTable.CACHE_DIRECTORY = cache_directory
+        results = run_benchmark(sizes, args.pairs, args.seed, args.time_budget, args.path_finders,
+                                args.starts_per_goal, args.table_cell_limit)
+    with open(args.output, "w") as file:
+        json.dump({"seed": args.seed, "pairs": args.pairs, "results": results}, file, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,76 @@
 import pygame
-import time
-import Bullet
+import GameClock
+import InputSource
+import AssetCache
 
 class Player(pygame.sprite.Sprite):
     
+    # Paths of the animation frames
+    animationPaths = {
+        "idle": [
+            "Sprites/Player/Idle/down_1.png",
+            "Sprites/Player/Idle/down_2.png",
+            "Sprites/Player/Idle/down_3.png",
+            "Sprites/Player/Idle/down_4.png",
+            "Sprites/Player/Idle/down_5.png",
+            "Sprites/Player/Idle/down_6.png",
+            "Sprites/Player/Idle/down_7.png",
+            "Sprites/Player/Idle/down_8.png",
+        ],
+        "walking_up": [
+            "Sprites/Player/Walking/up_1.png",
+            "Sprites/Player/Walking/up_2.png",
+            "Sprites/Player/Walking/up_3.png",
+            "Sprites/Player/Walking/up_4.png",
+            "Sprites/Player/Walking/up_5.png",
+            "Sprites/Player/Walking/up_6.png",
+            "Sprites/Player/Walking/up_7.png",
+            "Sprites/Player/Walking/up_8.png",
+        ],
+        "walking_down": [
+            "Sprites/Player/Walking/down_1.png",
+            "Sprites/Player/Walking/down_2.png",
+            "Sprites/Player/Walking/down_3.png",
+            "Sprites/Player/Walking/down_4.png",
+            "Sprites/Player/Walking/down_5.png",
+            "Sprites/Player/Walking/down_6.png",
+            "Sprites/Player/Walking/down_7.png",
+            "Sprites/Player/Walking/down_8.png",
+        ],
+        "walking_left": [
+            "Sprites/Player/Walking/left_1.png",
+            "Sprites/Player/Walking/left_2.png",
+            "Sprites/Player/Walking/left_3.png",
+            "Sprites/Player/Walking/left_4.png",
+            "Sprites/Player/Walking/left_5.png",
+            "Sprites/Player/Walking/left_6.png",
+            "Sprites/Player/Walking/left_7.png",
+            "Sprites/Player/Walking/left_8.png",
+        ],
+        "walking_right": [
+            "Sprites/Player/Walking/right_1.png",
+            "Sprites/Player/Walking/right_2.png",
+            "Sprites/Player/Walking/right_3.png",
+            "Sprites/Player/Walking/right_4.png",
+            "Sprites/Player/Walking/right_5.png",
+            "Sprites/Player/Walking/right_6.png",
+            "Sprites/Player/Walking/right_7.png",
+            "Sprites/Player/Walking/right_8.png",
+        ],
+        "shooting_up": [
+            "Sprites/Player/Shooting/up.png",
+        ],
+        "shooting_down": [
+            "Sprites/Player/Shooting/down.png",
+        ],
+        "shooting_left": [
+            "Sprites/Player/Shooting/left.png",
+        ],
+        "shooting_right": [
+            "Sprites/Player/Shooting/right.png"
+        ],
+    }
+
     def __init__(self, position, speed, bullet_manager, audio_manager):
         super().__init__()
         # Use a Vector2 for precise position arithmetic.
@@ -28,70 +95,8 @@ class Player(pygame.sprite.Sprite):
         }
 
         # Load animations. For simplicity, we assume each animation is a list of images.
-        self.animations = {
-            "idle": [
-                pygame.image.load("Sprites/Player/Idle/down_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Idle/down_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Idle/down_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Idle/down_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Idle/down_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Idle/down_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Idle/down_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Idle/down_8.png").convert_alpha(),
-            ],
-            "walking_up": [
-                pygame.image.load("Sprites/Player/Walking/up_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/up_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/up_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/up_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/up_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/up_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/up_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/up_8.png").convert_alpha(),
-            ],
-            "walking_down": [
-                pygame.image.load("Sprites/Player/Walking/down_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/down_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/down_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/down_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/down_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/down_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/down_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/down_8.png").convert_alpha(),
-            ],
-            "walking_left": [
-                pygame.image.load("Sprites/Player/Walking/left_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/left_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/left_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/left_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/left_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/left_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/left_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/left_8.png").convert_alpha(),
-            ],
-            "walking_right": [
-                pygame.image.load("Sprites/Player/Walking/right_1.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/right_2.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/right_3.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/right_4.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/right_5.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/right_6.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/right_7.png").convert_alpha(),
-                pygame.image.load("Sprites/Player/Walking/right_8.png").convert_alpha(),
-            ],
-            "shooting_up": [
-                pygame.image.load("Sprites/Player/Shooting/up.png").convert_alpha(),
-            ],
-            "shooting_down": [
-                pygame.image.load("Sprites/Player/Shooting/down.png").convert_alpha(),
-            ],
-            "shooting_left": [
-                pygame.image.load("Sprites/Player/Shooting/left.png").convert_alpha(),
-            ],
-            "shooting_right": [
-                pygame.image.load("Sprites/Player/Shooting/right.png").convert_alpha()
-            ],
-        }
+        # Frames come from the shared asset cache, so they are only decoded once per process.
+        self.animations = AssetCache.asset_cache.load_animations(Player.animationPaths)
 
         # Start with the idle animation image.
         self.image = self.animations["idle"][0]
@@ -162,7 +167,7 @@ class Player(pygame.sprite.Sprite):
 
     def updateMovement(self, health_system, audio_manager, puzzle_manager, current_level, dt):
         """Reads user input, updates the player's position, and prevents movement into walls."""
-        keys = pygame.key.get_pressed()
+        keys = InputSource.input_source.get_pressed()
         
         if self.solving_puzzle is not None:
             # do not move the player because a puzzle is being solved
@@ -191,10 +196,7 @@ class Player(pygame.sprite.Sprite):
 
             # Check for horizontal collisions with walls.
             wall_collisions = self.collision_manager.check_wall_collisions(self)
-            enemy_collisions = []
-            for enemy in self.enemy_sprites.copy():
-                if self.collision_manager.check_sprite_collision(self, enemy):
-                    enemy_collisions.append(1)
+            enemy_collisions = self.collision_manager.get_sprite_collisions(self, "enemies")
             
             if wall_collisions or enemy_collisions:
                 # Revert horizontal movement by restoring the previous x value.
@@ -228,10 +230,7 @@ class Player(pygame.sprite.Sprite):
 
             # Check for vertical collisions with walls.
             wall_collisions = self.collision_manager.check_wall_collisions(self)
-            enemy_collisions = []
-            for enemy in self.enemy_sprites.copy():
-                if self.collision_manager.check_sprite_collision(self, enemy):
-                    enemy_collisions.append(1)
+            enemy_collisions = self.collision_manager.get_sprite_collisions(self, "enemies")
                     
             if wall_collisions or enemy_collisions:
                 # Revert vertical movement by restoring the previous y value.
@@ -255,67 +254,77 @@ class Player(pygame.sprite.Sprite):
                 self.speed = self.default_speed
                 audio_manager.playSoundEffect("power_down")
                 
-            # Check if the player reached a power-up. Verify that it is new and not collected before.
-            speed_powerup_collisions = self.collision_manager.check_speed_powerup_collisions(self)
-            if speed_powerup_collisions:
-                for rect in speed_powerup_collisions:
-                    if rect not in self.collected_powerups:
-                        self.collected_powerups.append(rect)
-                        self.speed_powerup = True
-                        self.speed_powerup_timer = 0
-                        self.speed = self.default_speed * self.speed_boost_coeff
-                        audio_manager.playSoundEffect("power_up_speed")
-                
-            hp_powerup_collisions = self.collision_manager.check_hp_powerup_collisions(self)
-            if hp_powerup_collisions:
-                for rect in hp_powerup_collisions:
-                    if rect not in self.collected_powerups:
-                        self.collected_powerups.append(rect)
-                        health_system.heal(self.hp_boost_amount)
-                        audio_manager.playSoundEffect("power_up_hp")
-                        
-                        
-            # Check if the player reached a safe spot. It will return a list of rects (will be an empty list if no collision).
-            safe_spot_collisions = self.collision_manager.check_safe_spot_collisions(self)
-            if safe_spot_collisions:
-                if self.safe_spot_sound_played == False:
-                    audio_manager.playSoundEffect("safe_spot")
-                    self.safe_spot_sound_played = True
-                self.inside_safe_spot = True
-            else:
-                self.inside_safe_spot = False
-                self.safe_spot_sound_played = False
-                
-                
-            # Check if a puzzle needs to be opened
-            puzzle_tiles = list(puzzle_manager.puzzle_details[f'level_{current_level}'].keys())
-            for puzzle_coord in puzzle_tiles:
-                collision_rect = pygame.Rect(puzzle_coord[0], puzzle_coord[1], 32, 32)
-                if pygame.Rect.colliderect(self.collision_rect, collision_rect):
-                    if puzzle_manager.puzzle_details[f'level_{current_level}'][puzzle_coord]['attempts_left'] == 0:
-                        continue
-                    self.solving_puzzle = puzzle_coord
-                    puzzle_manager.load_puzzle(puzzle_coord, current_level)
-                    audio_manager.playSoundEffect("puzzle_enter")
-                
-                
-            # Check if the player reached the door. It will return a list of rects (will be an empty list if no collision).
-            if self.collision_manager.check_door_collision(self):
-                self.door_reached = True
-
             if keys[self.keyBindings["SHOOT"]]:
                 self.shoot()         
             
             
+    def handleTileContacts(self, tile_contacts, health_system, audio_manager, puzzle_manager, current_level):
+        """
+        Applies the trigger tiles the player touches this frame. tile_contacts maps each
+        trigger layer to the tile rects of it the player overlaps (see CollisionManager.find_contacts).
+        Returns the (layer name, rect) of every power-up collected, so its tile can be removed from the map.
+        """
+        collected = []
+        # Check if the player reached a power-up. Verify that it is new and not collected before.
+        speed_powerup_collisions = tile_contacts["PowerUpSpeed"]
+        if speed_powerup_collisions:
+            for rect in speed_powerup_collisions:
+                if rect not in self.collected_powerups:
+                    self.collected_powerups.append(rect)
+                    collected.append(("PowerUpSpeed", rect))
+                    self.speed_powerup = True
+                    self.speed_powerup_timer = 0
+                    self.speed = self.default_speed * self.speed_boost_coeff
+                    audio_manager.playSoundEffect("power_up_speed")
+            
+        hp_powerup_collisions = tile_contacts["PowerUpHP"]
+        if hp_powerup_collisions:
+            for rect in hp_powerup_collisions:
+                if rect not in self.collected_powerups:
+                    self.collected_powerups.append(rect)
+                    collected.append(("PowerUpHP", rect))
+                    health_system.heal(self.hp_boost_amount)
+                    audio_manager.playSoundEffect("power_up_hp")
+                    
+                    
+        # Check if the player reached a safe spot. It will return a list of rects (will be an empty list if no collision).
+        safe_spot_collisions = tile_contacts["SafeSpot"]
+        if safe_spot_collisions:
+            if self.safe_spot_sound_played == False:
+                audio_manager.playSoundEffect("safe_spot")
+                self.safe_spot_sound_played = True
+            self.inside_safe_spot = True
+        else:
+            self.inside_safe_spot = False
+            self.safe_spot_sound_played = False
+            
+            
+        # Check if a puzzle needs to be opened
+        puzzle_tiles = list(puzzle_manager.puzzle_details[f'level_{current_level}'].keys())
+        for puzzle_coord in puzzle_tiles:
+            collision_rect = pygame.Rect(puzzle_coord[0], puzzle_coord[1], 32, 32)
+            if pygame.Rect.colliderect(self.collision_rect, collision_rect):
+                if puzzle_manager.puzzle_details[f'level_{current_level}'][puzzle_coord]['attempts_left'] == 0:
+                    continue
+                self.solving_puzzle = puzzle_coord
+                puzzle_manager.load_puzzle(puzzle_coord, current_level)
+                audio_manager.playSoundEffect("puzzle_enter")
+            
+            
+        # Check if the player reached the door. It will return a list of rects (will be an empty list if no collision).
+        if tile_contacts["ExitDoor"]:
+            self.door_reached = True
+        return collected
+
+
     def shoot(self):
-        current_time = time.time() # Alternatively, I can use pygame.time.get_ticks()/1000.
+        current_time = GameClock.clock.now() # Wall clock, or simulated time in a headless run.
         if self.bulletCount == 0 and (current_time - self.lastShotTime) > self.shootingCooldown:
             self.shooting_anim = False
         if self.bulletCount > 0 and (current_time - self.lastShotTime) > self.shootingCooldown:
             self.bulletCount -= 1
             # Initialise a bullet at the player's position moving in self.direction.
-            bullet = Bullet.Bullet(self.position, self.direction, speed=250, damage=25, max_range=500)
-            self.bullet_manager.add_bullet(bullet)
+            self.bullet_manager.add_bullet(self.position, self.direction, self.collision_manager, speed=250, damage=25, max_range=500)
             self.lastShotTime = current_time
             # Play shooting sound which lasts ~0.5 second
             self.audio_manager.playSoundEffect("shoot")
@@ -323,7 +332,7 @@ class Player(pygame.sprite.Sprite):
 
     def updateAnimation(self, dt):
         """ Update the player's animation based on movement and direction."""
-        keys = pygame.key.get_pressed()
+        keys = InputSource.input_source.get_pressed()
         # A flag variable useful for later
         space_pressed = False
         # If Space was pressed and animation can be played (validation)
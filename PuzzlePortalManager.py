@@ -1,48 +1,93 @@
 import pygame
 import random
+from collections import OrderedDict
+import AssetPack
+
+
+class PuzzleImageCache:
+
+    def __init__(self, size, capacity=6):
+        """
+        Least-recently-used cache of puzzle images, decoded on first use and scaled to
+        the overlay size once, so drawing an open puzzle is a plain blit.
+        size: (width, height) of the puzzle overlay.
+        capacity: Most images kept at a time; a level shows at most five puzzles.
+        """
+        self.size = size
+        self.capacity = capacity
+        self.images = OrderedDict()   # (level, puzzle name) -> scaled Surface, oldest first
+        self.hits = 0
+        self.misses = 0
+
+
+    def get(self, level, name, path):
+        key = (level, name)
+        image = self.images.get(key)
+        if image is not None:
+            self.images.move_to_end(key)
+            self.hits += 1
+            return image
+        image = pygame.transform.scale(AssetPack.asset_pack.load_image(path).convert_alpha(), self.size)
+        self.images[key] = image
+        self.misses += 1
+        if len(self.images) > self.capacity:
+            self.images.popitem(last=False)
+        return image
+
+
+    def release_other_levels(self, level):
+        # Drops the images of every level but the given one.
+        for key in [key for key in self.images if key[0] != level]:
+            del self.images[key]
+
 
 class PuzzlePortalManager:
-    def __init__(self):
+    # Image paths of all puzzles in the game along with their solutions
+    puzzleData = {
+        'level_1': {'must_solve_1': ("Images/Puzzles/level1_mustsolve_1.png", 8),
+                    'must_solve_2': ("Images/Puzzles/level1_mustsolve_2.png", 10234),
+                    'easy_1': ("Images/Puzzles/level1_easy_1.png", 5),
+                    'easy_2': ("Images/Puzzles/level1_easy_2.png", 200),
+                    'easy_3': ("Images/Puzzles/level1_easy_3.png", 7),
+                    'medium_1': ("Images/Puzzles/level1_medium_1.png", 12),
+                    'medium_2': ("Images/Puzzles/level1_medium_2.png", 34),
+                    'medium_3': ("Images/Puzzles/level1_medium_3.png", 165),
+                    'hard_1': ("Images/Puzzles/level1_hard_1.png", 3),
+                    'hard_2': ("Images/Puzzles/level1_hard_2.png", 216),
+                    'hard_3': ("Images/Puzzles/level1_hard_3.png", 25),
+        },
+        'level_2': {'must_solve_1': ("Images/Puzzles/level2_mustsolve_1.png", 13),
+                    'must_solve_2': ("Images/Puzzles/level2_mustsolve_2.png", 50),
+                    'easy_1': ("Images/Puzzles/level2_easy_1.png", 8),
+                    'easy_2': ("Images/Puzzles/level2_easy_2.png", 72),
+                    'easy_3': ("Images/Puzzles/level2_easy_3.png", 13000),
+                    'medium_1': ("Images/Puzzles/level2_medium_1.png", 360),
+                    'medium_2': ("Images/Puzzles/level2_medium_2.png", 4),
+                    'medium_3': ("Images/Puzzles/level2_medium_3.png", 17),
+                    'hard_1': ("Images/Puzzles/level2_hard_1.png", 36),
+                    'hard_2': ("Images/Puzzles/level2_hard_2.png", 15),
+                    'hard_3': ("Images/Puzzles/level2_hard_3.png", 1),
+        },
+        'level_3': {'must_solve_1': ("Images/Puzzles/level3_mustsolve_1.png", 16),
+                    'must_solve_2': ("Images/Puzzles/level3_mustsolve_2.png", 1),
+                    'easy_1': ("Images/Puzzles/level3_easy_1.png", 10),
+                    'easy_2': ("Images/Puzzles/level3_easy_2.png", 1099),
+                    'easy_3': ("Images/Puzzles/level3_easy_3.png", 14),
+                    'medium_1': ("Images/Puzzles/level3_medium_1.png", 5),
+                    'medium_2': ("Images/Puzzles/level3_medium_2.png", 6),
+                    'medium_3': ("Images/Puzzles/level3_medium_3.png", 6),
+                    'hard_1': ("Images/Puzzles/level3_hard_1.png", 5),
+                    'hard_2': ("Images/Puzzles/level3_hard_2.png", 120),
+                    'hard_3': ("Images/Puzzles/level3_hard_3.png", 60),
+        },
+    }
+
+    def __init__(self, seed=None, image_size=(900, 450)):
+        # Random generator for picking puzzles; a fixed seed makes the choice reproducible
+        self.rng = random.Random(seed)
         
-        # A dictionary to store all puzzles in the game along with their solutions
-        self.puzzle_dataQA = {
-            'level_1': {'must_solve_1': (pygame.image.load("Images/Puzzles/level1_mustsolve_1.png").convert_alpha(), 8),
-                        'must_solve_2': (pygame.image.load("Images/Puzzles/level1_mustsolve_2.png").convert_alpha(), 10234),
-                        'easy_1': (pygame.image.load("Images/Puzzles/level1_easy_1.png").convert_alpha(), 5),
-                        'easy_2': (pygame.image.load("Images/Puzzles/level1_easy_2.png").convert_alpha(), 200),
-                        'easy_3': (pygame.image.load("Images/Puzzles/level1_easy_3.png").convert_alpha(), 7),
-                        'medium_1': (pygame.image.load("Images/Puzzles/level1_medium_1.png").convert_alpha(), 12),
-                        'medium_2': (pygame.image.load("Images/Puzzles/level1_medium_2.png").convert_alpha(), 34),
-                        'medium_3': (pygame.image.load("Images/Puzzles/level1_medium_3.png").convert_alpha(), 165),
-                        'hard_1': (pygame.image.load("Images/Puzzles/level1_hard_1.png").convert_alpha(), 3),
-                        'hard_2': (pygame.image.load("Images/Puzzles/level1_hard_2.png").convert_alpha(), 216),
-                        'hard_3': (pygame.image.load("Images/Puzzles/level1_hard_3.png").convert_alpha(), 25),
-            },
-            'level_2': {'must_solve_1': (pygame.image.load("Images/Puzzles/level2_mustsolve_1.png").convert_alpha(), 13),
-                        'must_solve_2': (pygame.image.load("Images/Puzzles/level2_mustsolve_2.png").convert_alpha(), 50),
-                        'easy_1': (pygame.image.load("Images/Puzzles/level2_easy_1.png").convert_alpha(), 8),
-                        'easy_2': (pygame.image.load("Images/Puzzles/level2_easy_2.png").convert_alpha(), 72),
-                        'easy_3': (pygame.image.load("Images/Puzzles/level2_easy_3.png").convert_alpha(), 13000),
-                        'medium_1': (pygame.image.load("Images/Puzzles/level2_medium_1.png").convert_alpha(), 360),
-                        'medium_2': (pygame.image.load("Images/Puzzles/level2_medium_2.png").convert_alpha(), 4),
-                        'medium_3': (pygame.image.load("Images/Puzzles/level2_medium_3.png").convert_alpha(), 17),
-                        'hard_1': (pygame.image.load("Images/Puzzles/level2_hard_1.png").convert_alpha(), 36),
-                        'hard_2': (pygame.image.load("Images/Puzzles/level2_hard_2.png").convert_alpha(), 15),
-                        'hard_3': (pygame.image.load("Images/Puzzles/level2_hard_3.png").convert_alpha(), 1),
-            },
-            'level_3': {'must_solve_1': (pygame.image.load("Images/Puzzles/level3_mustsolve_1.png").convert_alpha(), 16),
-                        'must_solve_2': (pygame.image.load("Images/Puzzles/level3_mustsolve_2.png").convert_alpha(), 1),
-                        'easy_1': (pygame.image.load("Images/Puzzles/level3_easy_1.png").convert_alpha(), 10),
-                        'easy_2': (pygame.image.load("Images/Puzzles/level3_easy_2.png").convert_alpha(), 1099),
-                        'easy_3': (pygame.image.load("Images/Puzzles/level3_easy_3.png").convert_alpha(), 14),
-                        'medium_1': (pygame.image.load("Images/Puzzles/level3_medium_1.png").convert_alpha(), 5),
-                        'medium_2': (pygame.image.load("Images/Puzzles/level3_medium_2.png").convert_alpha(), 6),
-                        'medium_3': (pygame.image.load("Images/Puzzles/level3_medium_3.png").convert_alpha(), 6),
-                        'hard_1': (pygame.image.load("Images/Puzzles/level3_hard_1.png").convert_alpha(), 5),
-                        'hard_2': (pygame.image.load("Images/Puzzles/level3_hard_2.png").convert_alpha(), 120),
-                        'hard_3': (pygame.image.load("Images/Puzzles/level3_hard_3.png").convert_alpha(), 60),
-            },
-        }
+        # Puzzle images are only decoded when a puzzle is opened, already scaled to image_size
+        self.puzzle_images = PuzzleImageCache(image_size)
         
         self.puzzle_details = {
             'level_1': {(1056, 208): {'type': 'easy', 'attempts_left': 3, 'teleport': (864, 368)},
@@ -94,12 +139,12 @@ class PuzzlePortalManager:
                 number = 2
             else:
                 number = 1
-            self.current_puzzle_image = self.puzzle_dataQA[f'level_{level}'][f'must_solve_{number}'][0]
-            self.current_puzzle_solution = self.puzzle_dataQA[f'level_{level}'][f'must_solve_{number}'][1]
+            name = f'must_solve_{number}'
         else:
-            number = random.randint(1, 3)
-            self.current_puzzle_image = self.puzzle_dataQA[f'level_{level}'][f"{self.puzzle_details[f'level_{level}'][puzzle_pos]['type']}_{number}"][0]
-            self.current_puzzle_solution = self.puzzle_dataQA[f'level_{level}'][f"{self.puzzle_details[f'level_{level}'][puzzle_pos]['type']}_{number}"][1]
+            number = self.rng.randint(1, 3)
+            name = f"{self.current_puzzle_type}_{number}"
+        path, self.current_puzzle_solution = PuzzlePortalManager.puzzleData[f'level_{level}'][name]
+        self.current_puzzle_image = self.puzzle_images.get(level, name, path)
     
     
     def check_puzzle_solution(self, player_input, level):
@@ -116,6 +161,11 @@ class PuzzlePortalManager:
             return False
 
 
+    def release_puzzle_images(self, level):
+        # Only the puzzles of the level being played stay in memory.
+        self.puzzle_images.release_other_levels(level)
+
+
     def teleport_player(self, level):
         return self.puzzle_details[f'level_{level}'][self.current_puzzle_pos]['teleport']
         
@@ -1,9 +1,8 @@
 import pygame
 import sys
-import time
+import argparse
+import random
 import AudioManager
-import MapRenderer
-import CollisionManager
 import HUD
 import Timer
 import Player
@@ -11,9 +10,18 @@ import Enemy
 import BulletManager
 import HealthSystem
 import PuzzlePortalManager
+import PathFinder
+import GameClock
+import InputSource
+import InputRecorder
+import FrameProfiler
+import LevelLoader
+import AssetCache
+import BackgroundCache
 
 pygame.init() # Initialise Pygame
 SCREEN_WIDTH, SCREEN_HEIGHT = 1280, 720   # Screen dimensions
+HUD_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, 48)   # The HUD strip above the map
 FONT = pygame.font.Font('SpecialElite.ttf', 38)
 # Setting a convenient reference to the colours
 BLACK = (0, 0, 0)
@@ -23,6 +31,62 @@ GREEN = (0, 255, 0)
 SOFT_GOLD = (238, 192, 124)
 DARK_BLUE = (30, 43, 79)  # Dark Blue (#1E2B4F)
 HIGHLIGHT_COLOR = (245, 206, 66)
+# Full-screen images of the menus and screens, scaled to the screen when loaded
+SCREEN_IMAGES = {
+    'startup': "Images\\1_Start-Up.png",
+    'story': "Images\\2_Story.png",
+    'menu_normal': "Images\\3_Menu_Normal.png",
+    'menu_paused': "Images\\3_Menu_Paused.png",
+    'instructions': "Images\\4_Instructions.png",
+    'difficulty_start': "Images\\5_Difficulty_Start.png",
+    'difficulty_beginner': "Images\\5_Difficulty_beginner.png",
+    'difficulty_average': "Images\\5_Difficulty_average.png",
+    'difficulty_expert': "Images\\5_Difficulty_expert.png",
+    'try_again': "Images\\6_Try_again.png",
+    'inter_level': "Images\\7_Inter_level.png",
+    'end_game': "Images\\8_End_game.jpg",
+}
+
+
+def load_screen_image(name):
+    return BackgroundCache.background_cache.load(SCREEN_IMAGES[name], (SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+def get_startup_backgrounds():
+    # Every screen, in the order they are first shown; the cache keeps the ones that fit its budget.
+    return [(path, (SCREEN_WIDTH, SCREEN_HEIGHT)) for path in SCREEN_IMAGES.values()]
+
+
+def get_startup_assets():
+    """
+    Returns the images ((path, mode, size) cache keys) and the sound paths decoded
+    at startup: the HUD, all sprite animations and the sound effects. The screens go to the
+    background cache instead, and puzzle images are decoded when a puzzle is first opened.
+    """
+    images = list(HUD.HUD.imageKeys.values())
+    animation_tables = [Player.Player.animationPaths] + list(Enemy.Enemy.animationPaths.values())
+    for animations in animation_tables:
+        for paths in animations.values():
+            images += [(path, "alpha", None) for path in paths]
+    images.append((BulletManager.BulletManager.imagePath, "alpha", None))
+    sounds = list(AudioManager.AudioManager.soundEffectPaths.values())
+    return images, sounds
+
+
+def report_startup_time():
+    # Loads the startup assets one at a time and then on the thread pool, and prints both times.
+    images, sounds = get_startup_assets()
+    backgrounds = get_startup_backgrounds()
+    AssetCache.asset_cache.clear()
+    BackgroundCache.background_cache.clear()
+    serial_seconds = AssetCache.asset_cache.preload(images, sounds, workers=1)
+    serial_seconds += BackgroundCache.background_cache.preload(backgrounds, workers=1)
+    AssetCache.asset_cache.clear()
+    BackgroundCache.background_cache.clear()
+    parallel_seconds = AssetCache.asset_cache.preload(images, sounds)
+    parallel_seconds += BackgroundCache.background_cache.preload(backgrounds)
+    print(f"Startup assets ({len(images) + len(backgrounds)} images, {len(sounds)} sounds): serial {serial_seconds * 1000:.0f} ms, "
+          f"thread pool {parallel_seconds * 1000:.0f} ms ({serial_seconds / parallel_seconds:.2f}x)")
 
 
 class States:
@@ -31,6 +95,24 @@ class States:
         self.next = None
         self.quit = False
         self.previous = None
+        # Set when the whole screen has to be drawn again, e.g. after entering the state
+        self.redraw = True
+        # Screen regions changed by the last draw. None means the whole screen changed.
+        self.dirty_rects = None
+
+
+    def draw_static(self, screen, background):
+        """
+        Draws a screen that only shows a still image. It is drawn once after
+        redraw is set; the frames after that report no dirty regions at all.
+        """
+        if not self.redraw:
+            self.dirty_rects = []
+            return
+        screen.fill((0, 0, 0))
+        screen.blit(background, (0, 0))
+        self.redraw = False
+        self.dirty_rects = None
   
 class StartUp(States):
     
@@ -44,11 +126,10 @@ class StartUp(States):
 
     def enter_state(self):
         print("StartUp: enter_state() -> Starting 5-second intro screen")
-        self.start_time = time.time()
+        self.start_time = GameClock.clock.now()
         
         # Load image once here instead of every frame
-        self.background = pygame.image.load("Images\\1_Start-Up.png").convert()
-        self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background = load_screen_image('startup')
 
 
     def get_event(self, event):
@@ -60,17 +141,15 @@ class StartUp(States):
         """
         Runs each frame. After 5 seconds, we mark this state done.
         """
-        if (time.time() - self.start_time) >= 5:
+        if (GameClock.clock.now() - self.start_time) >= 5:
             self.done = True  # Will flip to 'storytelling' state next
         
         self.draw(screen)
 
 
     def draw(self, screen):
-        # Clear screen (fill with black or any color)
-        screen.fill((0, 0, 0))
-        # Draw background image
-        screen.blit(self.background, (0, 0)) 
+        # Draw background image (only when it is not on screen already)
+        self.draw_static(screen, self.background)
    
      
     def cleanup(self):
@@ -90,11 +169,10 @@ class Storytelling(States):
 
     def enter_state(self):
         print("Storytelling: enter_state() -> Starting backstory screen")
-        self.start_time = time.time()
+        self.start_time = GameClock.clock.now()
 
         # Load the background image once
-        self.background = pygame.image.load("Images\\2_Story.png").convert()
-        self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background = load_screen_image('story')
         
         # Play the background music for the story screen
         self.audio_manager.playBackgroundMusic('story_screen')
@@ -110,7 +188,7 @@ class Storytelling(States):
         """
         Runs each frame. If Enter is pressed or 60 seconds pass, we're done.
         """
-        elapsed = time.time() - self.start_time
+        elapsed = GameClock.clock.now() - self.start_time
 
         if self.enter_pressed or elapsed >= 60:
             # Move on to the next state: "menu"
@@ -121,10 +199,8 @@ class Storytelling(States):
 
 
     def draw(self, screen):
-        # Clear the screen
-        screen.fill((0, 0, 0))
-        # Draw background image
-        screen.blit(self.background, (0, 0))
+        # Draw background image (only when it is not on screen already)
+        self.draw_static(screen, self.background)
   
     
     def cleanup(self):
@@ -156,10 +232,8 @@ class Menu(States):
         Load the images, set up default options, etc.
         """
         print("Menu state: enter_state() -> Entering Menu/Pause")
-        self.normal_background = pygame.image.load("Images\\3_Menu_Normal.png").convert()
-        self.normal_background = pygame.transform.scale(self.normal_background, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.paused_background = pygame.image.load("Images\\3_Menu_Paused.png").convert()
-        self.paused_background = pygame.transform.scale(self.paused_background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.normal_background = load_screen_image('menu_normal')
+        self.paused_background = load_screen_image('menu_paused')
         
         # Create a surface for drawing semi-transparent shapes if you want alpha
         self.highlight_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
@@ -179,10 +253,12 @@ class Menu(States):
             if event.key == pygame.K_UP:
                 # Move highlight up
                 self.selected_index = (self.selected_index - 1) % len(self.menu_options_rects)
+                self.redraw = True
                 self.audio_manager.playSoundEffect('menu_selection')
             elif event.key == pygame.K_DOWN:
                 # Move highlight down
                 self.selected_index = (self.selected_index + 1) % len(self.menu_options_rects)
+                self.redraw = True
                 self.audio_manager.playSoundEffect('menu_selection')
             elif event.key == pygame.K_RETURN:
                 if self.selected_index == 0:
@@ -224,6 +300,12 @@ class Menu(States):
             # Then blit the highlight_surface onto the destination (the screen)
             dest_surface.blit(self.highlight_surface, (0, 0))
             
+        # Nothing changes until the selection moves
+        if not self.redraw:
+            self.dirty_rects = []
+            return
+        self.redraw = False
+        self.dirty_rects = None
         # Clear the screen
         screen.fill((0, 0, 0))    
         # Draw the correct background, using checking game_active
@@ -256,11 +338,10 @@ class Instructions(States):
         
     def enter_state(self):
         print("Instructions: enter_state() -> Starting instructions screen")
-        self.start_time = time.time()
+        self.start_time = GameClock.clock.now()
         
         # Load the background image once
-        self.background = pygame.image.load("Images\\4_Instructions.png").convert()
-        self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background = load_screen_image('instructions')
         
         # Play the background music for the instruction screen
         self.audio_manager.playBackgroundMusic('instructions')
@@ -273,7 +354,7 @@ class Instructions(States):
             
             
     def update(self, screen, dt):
-        elapsed = time.time() - self.start_time
+        elapsed = GameClock.clock.now() - self.start_time
 
         if self.enter_pressed or elapsed >= 60:
             # Move on to the next state: "menu"
@@ -284,10 +365,8 @@ class Instructions(States):
         
         
     def draw(self, screen):
-        # Clear the screen
-        screen.fill((0, 0, 0))
-        # Draw background image
-        screen.blit(self.background, (0, 0))
+        # Draw background image (only when it is not on screen already)
+        self.draw_static(screen, self.background)
 
 
     def cleanup(self):
@@ -316,20 +395,16 @@ class Difficulty(States):
 
     def enter_state(self):
         print("Difficulty: enter_state() -> Starting difficulty selection screen")
-        self.start_background = pygame.image.load("Images\\5_Difficulty_Start.png").convert()
-        self.start_background = pygame.transform.scale(self.start_background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.start_background = load_screen_image('difficulty_start')
         
         if self.game_info['game_active'] == True:
             # If we came from the game, load the chosen difficulty background
             if self.difficulty_selected == 0:
-                self.paused_background = pygame.image.load("Images\\5_Difficulty_beginner.png").convert()
-                self.paused_background = pygame.transform.scale(self.paused_background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+                self.paused_background = load_screen_image('difficulty_beginner')
             elif self.difficulty_selected == 1:
-                self.paused_background = pygame.image.load("Images\\5_Difficulty_average.png").convert()
-                self.paused_background = pygame.transform.scale(self.paused_background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+                self.paused_background = load_screen_image('difficulty_average')
             elif self.difficulty_selected == 2:
-                self.paused_background = pygame.image.load("Images\\5_Difficulty_expert.png").convert()
-                self.paused_background = pygame.transform.scale(self.paused_background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+                self.paused_background = load_screen_image('difficulty_expert')
         else:
             # Current selection starts at the left-most item. This condition is in place
             # so that difficulty_selected will store the last chosen difficulty, and will
@@ -352,10 +427,12 @@ class Difficulty(States):
                 if event.key == pygame.K_LEFT:
                     # Move highlight left
                     self.difficulty_selected = (self.difficulty_selected - 1) % len(self.difficulty_options_rects)
+                    self.redraw = True
                     self.audio_manager.playSoundEffect('menu_selection')
                 elif event.key == pygame.K_RIGHT:
                     # Move highlight right
                     self.difficulty_selected = (self.difficulty_selected + 1) % len(self.difficulty_options_rects)
+                    self.redraw = True
                     self.audio_manager.playSoundEffect('menu_selection')
                 elif event.key == pygame.K_RETURN:
                     # Play click sound
@@ -391,6 +468,12 @@ class Difficulty(States):
             # Then blit the highlight_surface onto the destination (the screen)
             dest_surface.blit(self.highlight_surface, (0, 0))
             
+        # Nothing changes until the selection moves
+        if not self.redraw:
+            self.dirty_rects = []
+            return
+        self.redraw = False
+        self.dirty_rects = None
         # Clear the screen
         screen.fill((0, 0, 0))    
         # Draw the correct background, Using `game_active` to determine the options
@@ -429,9 +512,12 @@ class Game(States):
         self.audio_manager = audio_manager
 
         # Create instances of your components
-        self.map_renderer = MapRenderer.MapRenderer()
-        self.collision_manager = CollisionManager.CollisionManager(32, 32)
         self.bullet_manager = BulletManager.BulletManager()
+        # Map, collision indices and the pathfinding engine shared by every enemy,
+        # all taken from the level loaded in enter_state()
+        self.map_renderer = None
+        self.collision_manager = None
+        self.path_finder = None
         
         # Create groups for sprites
         self.all_sprites = pygame.sprite.Group()
@@ -442,6 +528,9 @@ class Game(States):
         self.current_level = 0
         self.level_switch = False
         self.level_reset = False
+        # Where the sprites were drawn last frame, and whether the puzzle was on screen
+        self.drawn_rects = []
+        self.puzzle_drawn = False
         
         
     def load_level_enemies(self, level_number):
@@ -494,12 +583,12 @@ class Game(States):
 
         self.hud = HUD.HUD(hp, time_value, FONT)
         self.timer = Timer.Timer(time_value)
-        self.health_system = HealthSystem.HealthSystem(hp)
-        self.puzzle_manager = PuzzlePortalManager.PuzzlePortalManager()
+        self.health_system = HealthSystem.HealthSystem(hp, self.audio_manager)
         # Variables for the puzzle system
         self.input_str = ""
         self.input_box = pygame.Rect(200, 500, 400, 50)
         self.puzzle_dimentions = (190, 140, 900, 450) # left, top, width, height
+        self.puzzle_manager = PuzzlePortalManager.PuzzlePortalManager(self.game_info['puzzle_seed'], self.puzzle_dimentions[2:])
         self.puzzle_tried = False
         self.puzzle_result = None
         self.puzzle_result_timer = 0
@@ -515,6 +604,8 @@ class Game(States):
     
     def reset_level(self):
         if self.level_switch == True:
+            # The finished level is not needed any more
+            LevelLoader.level_cache.evict(self.current_level)
             # Update the current level number.
             self.current_level += 1
             # Update the level switch variable
@@ -531,7 +622,7 @@ class Game(States):
         self.puzzle_result = None
         self.puzzle_result_timer = 0
         # Reset the bullet sprite group
-        self.bullet_manager.bullets.empty()
+        self.bullet_manager.clear()
         # Reset the level reset flag
         self.level_reset = False
         
@@ -554,9 +645,24 @@ class Game(States):
         if self.timer.is_paused == True:
                 self.timer.resume_timer()
         
-        self.map_renderer.load_map_data(str(self.current_level))
-        self.map_renderer.scale_all_tiles()
-        self.collision_manager.initialise(self.map_renderer)
+        # Resuming or retrying keeps the resident level. Otherwise use the level prepared
+        # in the background by Inter_level / Try_again, if there is one.
+        path_finder_name = self.game_info['path_finders'][self.current_level]
+        level = LevelLoader.level_cache.get(self.current_level, path_finder_name)
+        if level is None:
+            level = LevelLoader.level_loader.take(self.current_level, path_finder_name)
+            if level is None:
+                level = LevelLoader.load_level(self.current_level, path_finder_name)
+                level.finish()
+            LevelLoader.level_cache.put(level)
+        self.map_renderer = level.map_renderer
+        self.collision_manager = level.collision_manager
+        self.path_finder = level.path_finder
+        # A resident level keeps the power-ups collected on it; put them back unless the
+        # player is resuming with them still collected (after a retry or a new game they are not)
+        if not self.player.collected_powerups:
+            self.map_renderer.restore_tiles()
+        self.puzzle_manager.release_puzzle_images(self.current_level)
         
         # Play the background music for the story screen
         self.audio_manager.playBackgroundMusic(f'level_{self.current_level}')
@@ -588,25 +694,37 @@ class Game(States):
     
     
     def update(self, screen, dt):
+        profiler = FrameProfiler.profiler
+        profiler.mark("events")
         # Update the timer
         self.timer.update_timer(dt)
+        profiler.mark("timer")
         
         # Check if the timer has reached zero --> try again screen
         if self.timer.level_end == True:
             self.next = 'try_again'
             self.done = True
             self.level_reset = True
+            self.game_info['next_level'] = self.current_level
         
-        # Update sprites and any dynamic game logic
+        # Update sprites and any dynamic game logic. The enemy broadphase grid is rebuilt
+        # before the player and the bullets check against it.
+        self.collision_manager.update_sprite_grid("enemies", self.enemy_sprites)
         self.all_sprites.update(dt, self.collision_manager, self.enemy_sprites, self.health_system, self.audio_manager, self.puzzle_manager, self.current_level)
-        self.bullet_manager.update(dt, self.collision_manager, self.audio_manager, self.enemy_sprites)
-        self.enemy_sprites.update(dt, self.player, self.health_system, self.collision_manager, self.bullet_manager, self.audio_manager)
+        profiler.mark("all_sprites.update")
+        self.bullet_manager.update(dt)
+        profiler.mark("bullet_manager.update")
+        self.resolve_collisions()
+        profiler.mark("collisions")
+        self.enemy_sprites.update(dt, self.player, self.health_system, self.collision_manager, self.path_finder)
+        profiler.mark("enemy_sprites.update")
         
         # Check if the player has run out of health --> try again screen
         if self.health_system.current_health == 0:
             self.next = 'try_again'
             self.done = True
             self.level_reset = True
+            self.game_info['next_level'] = self.current_level
         
         # Check if the player has reached the end of the level
         if self.player.door_reached == True and self.timer.level_end == False:
@@ -618,6 +736,7 @@ class Game(States):
                 self.done = True
                 self.level_switch = True
                 self.level_reset = True
+                self.game_info['next_level'] = self.current_level + 1
 
         # Update HUD elements
         self.hud.update_hud(self.health_system.current_health, self.player.bulletCount, self.timer.get_remaining_time())
@@ -626,24 +745,72 @@ class Game(States):
         self.draw(screen, dt)
         
         
+    def resolve_collisions(self):
+        # Collision stage: every contact of this frame is found once and handled once.
+        bullet_hits, tile_contacts = self.collision_manager.find_contacts(self.player, self.bullet_manager)
+        for slot, enemy in bullet_hits:
+            # An enemy killed by an earlier bullet this frame takes no more hits
+            if not enemy.alive():
+                continue
+            enemy.hitByBullet(self.bullet_manager.hit(slot))
+            self.audio_manager.playSoundEffect("bullet_hit")
+        if tile_contacts is not None:
+            collected = self.player.handleTileContacts(tile_contacts, self.health_system, self.audio_manager, self.puzzle_manager, self.current_level)
+            # Collected power-ups disappear from the map
+            for layer_name, rect in collected:
+                self.map_renderer.clear_tile(layer_name, rect.x // 32, (rect.y - 48) // 32)
+        self.bullet_manager.remove_inactive()
+        
+        
     def draw(self, screen, dt):
-        screen.fill(BLACK)
-        # Draw the background map first
-        self.map_renderer.draw(screen)
+        profiler = FrameProfiler.profiler
+        profiler.mark("game logic")
+        # The puzzle covers the map, so the whole screen is drawn while it is open and once after it closes.
+        # With --full-redraw (dirty_rect_mode off) every frame is drawn whole.
+        full_redraw = (not self.game_info['dirty_rect_mode'] or self.redraw or self.puzzle_drawn
+                       or self.player.solving_puzzle is not None)
+        self.redraw = False
+        # Images can be bigger than the sprite's rect, so use the area actually blitted
+        sprite_rects = [sprite.image.get_rect(topleft=sprite.rect.topleft)
+                        for group in (self.all_sprites, self.enemy_sprites) for sprite in group]
+        sprite_rects += self.bullet_manager.get_rects()
+        hud_rects = self.hud.pop_dirty_rects()
+        if full_redraw:
+            screen.fill(BLACK)
+            # Draw the background map first
+            self.map_renderer.draw(screen)
+            repainted_rects = None
+        else:
+            # Only paint the background back over the changed tiles, last frame's sprites and changed HUD fields
+            repainted_rects = self.drawn_rects + self.map_renderer.pop_changed_rects() + hud_rects
+            # The HUD is drawn over the sprites, so a sprite reaching into its band repaints the band
+            if HUD_RECT.collidelist(sprite_rects) != -1:
+                repainted_rects.append(HUD_RECT.copy())
+            repainted_rects += self.hud.get_overlapped_rects(repainted_rects)
+            for rect in repainted_rects:
+                self.map_renderer.draw_area(screen, rect)
+        profiler.mark("MapRenderer.draw")
         
         # Draw all the sprites
         self.all_sprites.draw(screen)
         self.enemy_sprites.draw(screen)
         self.bullet_manager.draw(screen)
+        if full_redraw:
+            self.dirty_rects = None
+        else:
+            self.dirty_rects = repainted_rects + sprite_rects
+        self.drawn_rects = sprite_rects
+        profiler.mark("sprite draws")
         
-        # Draw the HUD overlay on top
-        self.hud.display_hud(screen)
+        # Draw the HUD overlay on top, only where the screen was painted again
+        self.hud.display_hud(screen, self.dirty_rects)
+        profiler.mark("HUD")
         
         # Draw the puzzle if the player is solving one
-        if self.player.solving_puzzle is not None:
-            puzzle_image = self.puzzle_manager.current_puzzle_image
-            puzzle_image = pygame.transform.scale(puzzle_image, (self.puzzle_dimentions[2], self.puzzle_dimentions[3]))
-            screen.blit(puzzle_image, (self.puzzle_dimentions[0], self.puzzle_dimentions[1]))
+        self.puzzle_drawn = self.player.solving_puzzle is not None
+        if self.puzzle_drawn:
+            # Already scaled to the puzzle size when it was loaded
+            screen.blit(self.puzzle_manager.current_puzzle_image, (self.puzzle_dimentions[0], self.puzzle_dimentions[1]))
             # Draw the input box
             pygame.draw.rect(screen, BLACK, self.input_box, 2)
             # Render the text.
@@ -674,7 +841,7 @@ class Game(States):
                             self.player.teleport(self.puzzle_manager.teleport_player(self.current_level))
                         if self.puzzle_manager.current_puzzle_type == 'must_solve':
                             if self.puzzle_result == False:
-                                self.health_system.take_damage(self.puzzle_damage, self.audio_manager)
+                                self.health_system.take_damage(self.puzzle_damage)
                         self.puzzle_tried = False
                         self.puzzle_result = None
                         self.player.solving_puzzle = None
@@ -685,9 +852,10 @@ class Game(States):
         self.audio_manager.stopAllSounds()
      
 class Try_again(States):   
-    def __init__(self, audio_manager):
+    def __init__(self, game_info, audio_manager):
         super().__init__()
         self.next = "game"
+        self.game_info = game_info
         self.background = None
         self.enter_pressed = False
         self.audio_manager = audio_manager
@@ -695,11 +863,13 @@ class Try_again(States):
     def enter_state(self):
         print("Try again: enter_state() -> Starting try again screen")
         # Load the background image once
-        self.background = pygame.image.load("Images\\6_Try_again.png").convert()
-        self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background = load_screen_image('try_again')
 
         # Play the background music for the try again screen
         self.audio_manager.playSoundEffect('try_again')
+        # Reload the level in the background while the player reads this screen
+        level = self.game_info['next_level']
+        LevelLoader.level_loader.start(level, self.game_info['path_finders'][level])
     
     def get_event(self, event):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
@@ -715,10 +885,8 @@ class Try_again(States):
         self.draw(screen)
     
     def draw(self, screen):
-        # Clear the screen
-        screen.fill((0, 0, 0))
-        # Draw background image
-        screen.blit(self.background, (0, 0))
+        # Draw background image (only when it is not on screen already)
+        self.draw_static(screen, self.background)
 
     def cleanup(self):
         print("Try again: cleanup() -> Closing try again screen")
@@ -726,9 +894,10 @@ class Try_again(States):
         self.audio_manager.stopAllSounds()
                
 class Inter_level(States):
-    def __init__(self, audio_manager):
+    def __init__(self, game_info, audio_manager):
         super().__init__()
         self.next = "game"
+        self.game_info = game_info
         self.background = None
         self.enter_pressed = False
         self.audio_manager = audio_manager
@@ -736,11 +905,13 @@ class Inter_level(States):
     def enter_state(self):
         print("Inter-level: enter_state() -> Starting inter-level screen")
         # Load the background image once
-        self.background = pygame.image.load("Images\\7_Inter_level.png").convert()
-        self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background = load_screen_image('inter_level')
 
         # Play the background music for the level completed screen
         self.audio_manager.playSoundEffect('level_completed')
+        # Load the next level in the background while the player reads this screen
+        level = self.game_info['next_level']
+        LevelLoader.level_loader.start(level, self.game_info['path_finders'][level])
     
     def get_event(self, event):
         if event.type == pygame.KEYDOWN and event.key == pygame.K_RETURN:
@@ -756,10 +927,8 @@ class Inter_level(States):
         self.draw(screen)
       
     def draw(self, screen):
-        # Clear the screen
-        screen.fill((0, 0, 0))
-        # Draw background image
-        screen.blit(self.background, (0, 0))
+        # Draw background image (only when it is not on screen already)
+        self.draw_static(screen, self.background)
 
     def cleanup(self):
         print("Inter-level: cleanup() -> Closing inter-level screen")
@@ -790,8 +959,7 @@ class End_game(States):
     def enter_state(self):
         print("End game: enter_state() -> Starting end game screen")
         # Load and scale the background image.
-        self.background = pygame.image.load("Images\\8_End_game.jpg").convert()
-        self.background = pygame.transform.scale(self.background, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        self.background = load_screen_image('end_game')
         # Play the background music for the story screen
         self.audio_manager.playBackgroundMusic('game_end')
 
@@ -846,11 +1014,27 @@ class Control:
         # instance's attributes) with the provided settings, effectively
         # setting the attributes dynamically based on the keyword arguments
         # Now I can access these settings as attributes of the instance.
+        self.record = None   # Path to record the session to, if any
+        self.replay = None   # Path of a recorded session to replay, if any
+        self.dirty_rect_mode = False   # Push only the regions the state reports as changed
+        self.startup_report = False    # Time loading the startup assets serially and in parallel
+        self.startup_workers = 1       # Threads decoding the startup assets (1: one at a time on this thread, None: pool default)
+        self.background_budget = BackgroundCache.DEFAULT_BUDGET   # Bytes of screen backgrounds kept decoded
+        self.compress_backgrounds = True   # Keep evicted backgrounds as compressed pixels
         self.__dict__.update(settings)
         self.done = False
         self.screen = pygame.display.set_mode(self.size, pygame.NOFRAME)
         pygame.display.set_caption(self.title)
         pygame.mixer.init()  # Initialise the mixer module for sound
+        BackgroundCache.background_cache.configure(self.background_budget, self.compress_backgrounds)
+        # Decode every image and sound now, before the states need them. One at a time by
+        # default: the thread pool was slower than that on the machines it was measured on.
+        if self.startup_report:
+            report_startup_time()
+        else:
+            startup_seconds = AssetCache.asset_cache.preload(*get_startup_assets(), workers=self.startup_workers)
+            startup_seconds += BackgroundCache.background_cache.preload(get_startup_backgrounds(), workers=self.startup_workers)
+            print(f"Startup assets loaded in {startup_seconds * 1000:.0f} ms")
         self.audio_manager = AudioManager.AudioManager()  # Create an instance of the AudioManager class
         self.audio_manager.initialise()
         self.clock = pygame.time.Clock()
@@ -859,8 +1043,27 @@ class Control:
                          'Time_default': 180,
                          'HP_scale': 1,
                          'Time_scale': 1,
+                         'puzzle_seed': None,
+                         'path_finders': dict(PathFinder.LEVEL_PATH_FINDERS),
+                         'next_level': 1,
+                         'dirty_rect_mode': self.dirty_rect_mode,
         }
         
+        # When recording or replaying, the puzzles use the recorded seed and the cooldowns run on the
+        # recorded frame times instead of the wall clock, so a replay follows the session exactly.
+        self.recorder = None
+        self.input_replay = None
+        if self.replay:
+            self.input_replay = InputRecorder.InputReplay(self.replay)
+            self.game_info['puzzle_seed'] = self.input_replay.seed
+            InputSource.input_source.set_provider(self.input_replay)
+            GameClock.clock.start_simulation()
+        elif self.record:
+            self.game_info['puzzle_seed'] = random.randrange(2 ** 32)
+            self.recorder = InputRecorder.InputRecorder(self.record, self.game_info['puzzle_seed'])
+            InputSource.input_source.set_provider(self.recorder)
+            GameClock.clock.start_simulation()
+        
     # Set up all the states
     def setup_states(self, state_dict, start_state):
         self.state_dict = state_dict
@@ -877,6 +1080,7 @@ class Control:
         self.state = self.state_dict[self.state_name]
         self.state.enter_state()
         self.state.previous = previous
+        self.state.redraw = True
         
     # Update the current state
     def update(self, dt):
@@ -887,29 +1091,65 @@ class Control:
         self.state.update(self.screen, dt)
         
     # Get events from the current state
-    def event_loop(self):
-        for event in pygame.event.get():
+    def event_loop(self, events):
+        for event in events:
             if event.type == pygame.QUIT:
                 self.done = True
+            # F3 toggles the frame time profiler overlay
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                FrameProfiler.profiler.toggle()
+                self.state.redraw = True
+            # The window was uncovered: its contents have to be drawn again
+            if event.type == pygame.WINDOWEXPOSED:
+                self.state.redraw = True
             self.state.get_event(event)
             
+    # Push the frame to the display
+    def update_display(self, overlay_rect):
+        if self.dirty_rect_mode and self.state.dirty_rects is not None:
+            dirty_rects = self.state.dirty_rects
+            if overlay_rect is not None:
+                dirty_rects = dirty_rects + [overlay_rect]
+            if dirty_rects:
+                pygame.display.update(dirty_rects)
+        else:
+            pygame.display.update()
+            
     # Main game loop       
     def main_game_loop(self):
         while not self.done:
-            # Setting the FPS restrictions
-            delta_time = self.clock.tick(self.fps)/1000.0 
-            self.event_loop()
+            if self.input_replay is not None:
+                # Replays run as fast as possible, with the recorded frame times and events
+                frame = self.input_replay.next_frame()
+                if frame is None:
+                    break
+                delta_time, events = frame
+                pygame.event.pump()
+            else:
+                # Setting the FPS restrictions
+                delta_time = self.clock.tick(self.fps)/1000.0 
+                events = pygame.event.get()
+                if self.recorder is not None:
+                    delta_time = InputRecorder.quantise_dt(delta_time)
+                    self.recorder.record_frame(delta_time, events)
+            if GameClock.clock.simulated:
+                GameClock.clock.advance(delta_time)
+            profiler = FrameProfiler.profiler
+            profiler.begin_frame()
+            self.event_loop(events)
             self.update(delta_time)
-            pygame.display.update()
+            profiler.mark("other")
+            overlay_rect = profiler.draw(self.screen)
+            profiler.mark("profiler overlay")
+            self.update_display(overlay_rect)
+            profiler.mark("pygame.display.update")
+            profiler.end_frame()
+        
+        if self.recorder is not None:
+            self.recorder.close()
 
 
-def main():
-    settings = {
-        'size': (SCREEN_WIDTH, SCREEN_HEIGHT),
-        'fps': 60,
-        'title': "MazeGame",
-    }
-    
+def create_app(settings):
     app = Control(**settings)
     state_dict = {
         "startup": StartUp(),
@@ -918,12 +1158,46 @@ def main():
         "difficulty": Difficulty(app.game_info, app.audio_manager),      # Difficulty class
         "instructions": Instructions(app.audio_manager),                 # Instructions class
         "game": Game(app.game_info, app.audio_manager),                  # Game class
-        "try_again": Try_again(app.audio_manager),
-        "inter_level": Inter_level(app.audio_manager),
+        "try_again": Try_again(app.game_info, app.audio_manager),
+        "inter_level": Inter_level(app.game_info, app.audio_manager),
         "end_game": End_game(app.audio_manager)
     }
     
     app.setup_states(state_dict, 'startup')
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maze Puzzle Game")
+    parser.add_argument("--record", help="Record the session's input to this file.")
+    parser.add_argument("--replay", help="Replay a recorded session from this file.")
+    parser.add_argument("--full-redraw", action="store_true",
+                        help="Push the whole screen every frame instead of only the changed regions.")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Compare loading the startup assets one at a time with the thread pool.")
+    parser.add_argument("--startup-workers", type=int, default=1,
+                        help="Threads decoding the startup assets: 1 loads them one at a time (the default), "
+                             "0 uses the thread pool's default size.")
+    parser.add_argument("--background-budget", type=float, default=BackgroundCache.DEFAULT_BUDGET / (1024 * 1024),
+                        help="Megabytes of decoded screen backgrounds to keep in memory.")
+    parser.add_argument("--no-compressed-backgrounds", action="store_true",
+                        help="Drop evicted screen backgrounds instead of keeping them compressed.")
+    args = parser.parse_args()
+    
+    settings = {
+        'size': (SCREEN_WIDTH, SCREEN_HEIGHT),
+        'fps': 60,
+        'title': "MazeGame",
+        'record': args.record,
+        'replay': args.replay,
+        'dirty_rect_mode': not args.full_redraw,
+        'startup_report': args.startup_report,
+        'startup_workers': args.startup_workers or None,
+        'background_budget': int(args.background_budget * 1024 * 1024),
+        'compress_backgrounds': not args.no_compressed_backgrounds,
+    }
+    
+    app = create_app(settings)
     app.main_game_loop()
     pygame.quit()
     sys.exit()
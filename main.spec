@@ -1,11 +1,12 @@
 # -*- mode: python ; coding: utf-8 -*-
 
 
+# Images, sprites and sounds ship as one file: run "python AssetPack.py" before building.
 a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('Sounds', 'Sounds'), ('Images', 'Images'), ('Maps', 'Maps'), ('Sprites', 'Sprites')],
+    datas=[('assets.pack', '.'), ('Maps', 'Maps')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The game's modules live in the repository root; pygame runs without a window or sound device.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,102 @@
+import math
+import random
+import pygame
+import pytest
+import CollisionManager
+import CompiledLevel
+import MapGrid
+
+TILE_SIZE = 32
+
+
+class FakeMapRenderer:
+
+    def __init__(self, width, height, layers):
+        """ The parts of a loaded level that CollisionManager.initialise() reads. layers: (name, rows of GIDs). """
+        self.width = width
+        self.height = height
+        self.layers = []
+        for name, rows in layers:
+            occupied_cells = [(x, y) for y, row in enumerate(rows) for x, gid in enumerate(row) if gid]
+            self.layers.append(CompiledLevel.CompiledLayer(name, True, rows, occupied_cells))
+        self.visible_layers = self.layers
+
+
+    def get_tmx_data(self):
+        return self
+
+
+    def get_scaled_tiles(self):
+        return {1: pygame.Surface((TILE_SIZE, TILE_SIZE))}
+
+
+    def get_map_grid(self):
+        grid = MapGrid.MapGrid(self.width, self.height)
+        for layer in self.layers:
+            if layer.name == "Walls":
+                for x, y in layer.occupied_cells:
+                    grid.cells[y * self.width + x] = 1
+        return grid
+
+
+def make_collision_manager(width, height, layers):
+    collision_manager = CollisionManager.CollisionManager(TILE_SIZE, TILE_SIZE)
+    collision_manager.initialise(FakeMapRenderer(width, height, layers))
+    return collision_manager
+
+
+def tile_rect(x, y):
+    # Screen rect of a tile (48 pixels are reserved for the HUD).
+    return pygame.Rect(x * TILE_SIZE, y * TILE_SIZE + 48, TILE_SIZE, TILE_SIZE)
+
+
+def test_layers_with_the_same_name_are_merged():
+    first = [[1, 0, 0], [0, 0, 0]]
+    second = [[0, 0, 0], [0, 0, 1]]
+    collision_manager = make_collision_manager(3, 2, [("Walls", first), ("Walls", second)])
+    found = collision_manager.check_rect_collision(pygame.Rect(0, 48, 3 * TILE_SIZE, 2 * TILE_SIZE), "Walls")
+    assert sorted(map(tuple, found)) == sorted([tuple(tile_rect(0, 0)), tuple(tile_rect(2, 1))])
+
+
+def test_layers_with_other_names_are_kept_apart():
+    walls = [[1, 0], [0, 0]]
+    doors = [[0, 0], [0, 1]]
+    collision_manager = make_collision_manager(2, 2, [("Walls", walls), ("ExitDoor", doors)])
+    everything = pygame.Rect(0, 48, 2 * TILE_SIZE, 2 * TILE_SIZE)
+    assert collision_manager.check_rect_collision(everything, "Walls") == [tile_rect(0, 0)]
+    assert collision_manager.check_rect_collision(everything, "ExitDoor") == [tile_rect(1, 1)]
+    assert collision_manager.check_rect_collision(everything, "Portals") == []
+
+
+def walk_to_wall(collision_manager, rect, direction, limit):
+    # Reference for get_wall_distance(): move the rect one pixel at a time until it overlaps a wall.
+    for distance in range(limit):
+        moved = rect.move(direction[0] * distance, direction[1] * distance)
+        if collision_manager.check_rect_collision(moved, "Walls"):
+            return distance
+    return math.inf
+
+
+def test_get_wall_distance_matches_moving_one_pixel_at_a_time():
+    rng = random.Random(0)
+    width, height = 12, 9
+    rows = [[1 if rng.random() < 0.25 else 0 for x in range(width)] for y in range(height)]
+    collision_manager = make_collision_manager(width, height, [("Walls", rows)])
+    limit = (width + height) * TILE_SIZE
+    for i in range(300):
+        size = rng.choice([(8, 8), (28, 28), (40, 12)])
+        rect = pygame.Rect(rng.randrange(-16, width * TILE_SIZE), rng.randrange(32, height * TILE_SIZE + 48), *size)
+        for direction in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+            expected = walk_to_wall(collision_manager, rect, direction, limit)
+            assert collision_manager.get_wall_distance(rect, direction) == expected, (rect, direction)
+
+
+@pytest.mark.parametrize("direction", [(1, 0), (-1, 0), (0, 1), (0, -1)])
+def test_get_wall_distance_without_walls_is_infinite(direction):
+    collision_manager = make_collision_manager(4, 4, [("Walls", [[0] * 4 for y in range(4)])])
+    assert collision_manager.get_wall_distance(pygame.Rect(40, 90, 8, 8), direction) == math.inf
+
+
+def test_get_wall_distance_is_zero_inside_a_wall():
+    collision_manager = make_collision_manager(3, 3, [("Walls", [[0, 0, 0], [0, 1, 0], [0, 0, 0]])])
+    assert collision_manager.get_wall_distance(pygame.Rect(40, 90, 8, 8), (1, 0)) == 0
@@ -0,0 +1,65 @@
+import os
+import shutil
+import pytest
+import CompiledLevel
+import LevelCompiler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def map_directory(tmp_path):
+    # A copy of the maps, so the tests can edit the sources.
+    directory = tmp_path / "Maps"
+    shutil.copytree(os.path.join(ROOT, "Maps"), directory, ignore=shutil.ignore_patterns("Compiled", "NavCache"))
+    return str(directory)
+
+
+@pytest.fixture
+def compiled_filename(map_directory):
+    tmx_filename = os.path.join(map_directory, "Level_1.tmx")
+    compiled_filename = LevelCompiler.get_compiled_filename(tmx_filename)
+    LevelCompiler.compile_level(tmx_filename, compiled_filename, navigation=False)
+    return compiled_filename
+
+
+def touch_source(filename):
+    # Changes the file's contents without breaking it.
+    with open(filename, "a") as file:
+        file.write("\n")
+
+
+def test_fresh_level_is_loaded(map_directory, compiled_filename):
+    level = CompiledLevel.load_compiled_level(compiled_filename, map_directory)
+    assert level is not None
+    assert not level.is_stale(map_directory)
+    assert level.sources[0] == "Level_1.tmx"
+    assert any(image is not None for image in level.images)
+
+
+def test_edited_tmx_makes_level_stale(map_directory, compiled_filename):
+    touch_source(os.path.join(map_directory, "Level_1.tmx"))
+    assert CompiledLevel.CompiledLevel(compiled_filename).is_stale(map_directory)
+    assert CompiledLevel.load_compiled_level(compiled_filename, map_directory) is None
+
+
+def test_edited_tileset_makes_level_stale(map_directory, compiled_filename):
+    level = CompiledLevel.CompiledLevel(compiled_filename)
+    tilesets = level.sources[1:]
+    assert tilesets
+    touch_source(os.path.join(map_directory, tilesets[0]))
+    assert level.is_stale(map_directory)
+    assert CompiledLevel.load_compiled_level(compiled_filename, map_directory) is None
+
+
+def test_missing_tileset_makes_level_stale(map_directory, compiled_filename):
+    level = CompiledLevel.CompiledLevel(compiled_filename)
+    os.remove(os.path.join(map_directory, level.sources[-1]))
+    assert level.is_stale(map_directory)
+
+
+def test_missing_or_invalid_file_is_not_loaded(map_directory, tmp_path):
+    assert CompiledLevel.load_compiled_level(str(tmp_path / "missing.lvl"), map_directory) is None
+    invalid = tmp_path / "invalid.lvl"
+    invalid.write_bytes(b"MZLV")
+    assert CompiledLevel.load_compiled_level(str(invalid), map_directory) is None
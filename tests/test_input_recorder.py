@@ -0,0 +1,49 @@
+import pygame
+import pytest
+import InputRecorder
+import InputSource
+
+FRAMES = [
+    (0.016667, [pygame.K_w], [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a, unicode="a")]),
+    (0.0333333, [pygame.K_a, pygame.K_SPACE], []),
+    (0.0171, [], [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_RETURN, unicode=""),
+                  pygame.event.Event(pygame.MOUSEMOTION, pos=(1, 2)),
+                  pygame.event.Event(pygame.QUIT)]),
+]
+
+
+def record(filename, seed, monkeypatch):
+    recorder = InputRecorder.InputRecorder(filename, seed)
+    for dt, held, events in FRAMES:
+        monkeypatch.setattr(pygame.key, "get_pressed", lambda held=held: InputSource.KeyState(held))
+        recorder.record_frame(dt, events)
+        assert [key for key in InputRecorder.RECORDED_KEYS if recorder.get_pressed()[key]] == held
+    recorder.close()
+
+
+def test_replay_matches_the_recording(tmp_path, monkeypatch):
+    filename = tmp_path / "session.rec"
+    record(filename, 1234, monkeypatch)
+
+    replay = InputRecorder.InputReplay(filename)
+    assert replay.seed == 1234
+    assert replay.keys == InputRecorder.RECORDED_KEYS
+    for dt, held, events in FRAMES:
+        replay_dt, replay_events = replay.next_frame()
+        assert replay_dt == InputRecorder.quantise_dt(dt)
+        assert [key for key in InputRecorder.RECORDED_KEYS if replay.get_pressed()[key]] == held
+        # Only KEYDOWN and QUIT events are recorded.
+        expected = [event for event in events if event.type in (pygame.KEYDOWN, pygame.QUIT)]
+        assert [event.type for event in replay_events] == [event.type for event in expected]
+        for replayed, event in zip(replay_events, expected):
+            if event.type == pygame.KEYDOWN:
+                assert (replayed.key, replayed.unicode) == (event.key, event.unicode)
+    assert replay.next_frame() is None
+    assert replay.frames_played == len(FRAMES)
+
+
+def test_replay_rejects_other_files(tmp_path):
+    filename = tmp_path / "other.rec"
+    filename.write_bytes(b"XXXX" + bytes(InputRecorder.HEADER.size))
+    with pytest.raises(ValueError):
+        InputRecorder.InputReplay(filename)
@@ -0,0 +1,102 @@
+import random
+import pytest
+import AStar_PathFinder
+import DistanceTable
+import MapGrid
+from PathFinder_Benchmark import generate_maze, bfs_distances, is_optimal_step
+
+# The cells an off-grid goal would wrap around to are walkable, so a missing bounds check shows.
+ROWS = [
+    [0, 0, 0, 0],
+    [0, 1, 0, 0],
+    [0, 0, 0, 0],
+]
+
+
+@pytest.mark.parametrize("start, goal", [
+    ((0, 0), (4, 0)),    # Past the right edge, would wrap around to (0, 1)
+    ((0, 0), (-1, 2)),   # Past the left edge, would wrap around to (3, 1)
+    ((0, 0), (0, 3)),    # Below the last row
+    ((4, 0), (0, 0)),
+    ((0, -1), (0, 0)),
+])
+def test_a_star_off_grid_returns_none(start, goal):
+    assert AStar_PathFinder.a_star(MapGrid.MapGrid.from_rows(ROWS), start, goal) is None
+
+
+def test_a_star_wall_goal_returns_none():
+    assert AStar_PathFinder.a_star(MapGrid.MapGrid.from_rows(ROWS), (0, 0), (1, 1)) is None
+
+
+def test_a_star_start_is_goal():
+    assert AStar_PathFinder.a_star(MapGrid.MapGrid.from_rows(ROWS), (2, 1), (2, 1)) == [(2, 1)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_a_star_finds_shortest_paths(seed):
+    rng = random.Random(seed)
+    grid = generate_maze(21, 15, rng, 0.5)
+    walkable = [(x, y) for y in range(grid.height) for x in range(grid.width) if grid.is_walkable(x, y)]
+    for i in range(10):
+        goal = rng.choice(walkable)
+        distances = bfs_distances(grid, goal)
+        for start in rng.sample(walkable, 10):
+            path = AStar_PathFinder.a_star(grid, start, goal)
+            assert path[0] == start and path[-1] == goal
+            assert len(path) - 1 == distances[start]
+            for a, b in zip(path, path[1:]):
+                assert grid.is_walkable(*b) and abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1
+
+
+def test_distance_table_steps_are_optimal():
+    grid = generate_maze(15, 11, random.Random(1), 0.5)
+    table = DistanceTable.DistanceTable()
+    table.build(grid)
+    for goal in table.cells:
+        distances = bfs_distances(grid, goal)
+        for start in table.cells:
+            assert is_optimal_step(table.get_next_step(start, goal), start, distances)
+
+
+def test_distance_table_save_and_load_round_trip(tmp_path):
+    grid = generate_maze(15, 11, random.Random(2), 0.5)
+    built = DistanceTable.DistanceTable()
+    built.build(grid)
+    filename = tmp_path / "table.nav"
+    built.save(filename)
+
+    loaded = DistanceTable.DistanceTable()
+    loaded.load(filename)
+    assert (loaded.width, loaded.height, loaded.count) == (built.width, built.height, built.count)
+    assert loaded.cells == built.cells
+    assert list(loaded.cell_ids) == list(built.cell_ids)
+    assert list(loaded.next_hop) == list(built.next_hop)
+    assert list(loaded.distance) == list(built.distance)
+    for goal in built.cells[::7]:
+        for start in built.cells:
+            assert loaded.get_next_step(start, goal) == built.get_next_step(start, goal)
+
+
+def test_distance_table_rejects_truncated_data(tmp_path):
+    table = DistanceTable.DistanceTable()
+    table.build(MapGrid.MapGrid.from_rows(ROWS))
+    filename = tmp_path / "table.nav"
+    table.save(filename)
+    data = filename.read_bytes()
+    with pytest.raises(ValueError):
+        DistanceTable.DistanceTable().load_buffer(data[:-1])
+    with pytest.raises(ValueError):
+        DistanceTable.DistanceTable().load_buffer(b"XXXX" + data[4:])
+
+
+def test_distance_table_prepare_uses_the_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(DistanceTable, "CACHE_DIRECTORY", str(tmp_path))
+    grid = MapGrid.MapGrid.from_rows(ROWS)
+    first = DistanceTable.DistanceTable()
+    first.prepare(grid)
+    assert (tmp_path / f"{first.get_grid_hash(grid)}.nav").exists()
+
+    monkeypatch.setattr(DistanceTable.DistanceTable, "build", lambda self, grid: pytest.fail("table was rebuilt"))
+    second = DistanceTable.DistanceTable()
+    second.prepare(grid)
+    assert list(second.next_hop) == list(first.next_hop)